@@ -15,108 +15,270 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 import json
 import os
+import marshal
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, replace
 from types import SimpleNamespace
 from textual.app import App, ComposeResult
 from textual import on, work
 from textual.containers import Horizontal, Vertical, VerticalScroll, Grid
-from textual.widgets import Header, Button, Static, Select
-from tui.screens import ArtNetScreen, QuitScreen, ConfigScreen, ImportDiscovery
+from textual.binding import Binding
+from textual.widgets import Header, Button, Static, Select, OptionList
+from textual.widgets.option_list import Option
+from tui.screens import (
+    ArtNetScreen,
+    QuitScreen,
+    ConfigScreen,
+    ImportDiscovery,
+    cached_network_cards,
+)
 import uuid as py_uuid
-from tui.create_mvr import create_mvr
-from textual_fspicker import FileSave, Filters
-from tui.gdtf_share.gdtf import GDTFScreen
 from pathlib import Path
+from rich.text import Text
 
 try:
-    import keyring
-    from keyring.errors import KeyringError
-except ImportError:  # pragma: no cover - optional dependency at runtime
-    keyring = None
-    KeyringError = Exception
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 
-class MVRDisplay(VerticalScroll):
-    def update_items(self, items):
-        self.remove_children()
-        for layer, fixtures in items.items():
-            self.mount(Static(f"Layer: [blue]{self.app.get_layer_name(layer)}[/blue]"))
+def json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
 
-            for index, fixture in enumerate(fixtures):
-                self.mount(MVRFixtureRow(layer, index, fixture))
 
+# bump when the layout of the GDTF Share cache changes
+GDTF_CACHE_VERSION = 4
 
-class MVRFixtureRow(Horizontal):
-    def __init__(self, layer_id, index, fixture):
-        super().__init__()
-        self.layer_id = layer_id
-        self.index = index
-        self.fixture = fixture
+_keyring = None
 
-    def compose(self) -> ComposeResult:
-        yield Button("x", classes="remove_fixture", variant="error")
-        yield Static(
-            f"[green]{self.fixture.short_name}[/green] "
-            f"{f'IP Address: {self.fixture.ip_address}' if self.fixture.ip_address else ''} "
-            f"{f'Universe: {self.fixture.universe}' if self.fixture.universe else ''} "
-            f"{f'DMX: {self.fixture.address}' if self.fixture.address else ''}"
-        )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        if "remove_fixture" in event.button.classes:
-            self.app.remove_mvr_fixture(self.layer_id, self.index)
+def _import_keyring():
+    """Import keyring on first use, it is slow to load its backends."""
+    global _keyring
+    if _keyring is None:
+        try:
+            import keyring
+            from keyring.errors import KeyringError
+        except ImportError:  # pragma: no cover - optional dependency at runtime
+            keyring = None
+            KeyringError = Exception
+        _keyring = (keyring, KeyringError)
+    return _keyring
+
+
+def _trigrams(text):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _build_trigrams(search_rows):
+    """Trigram -> row numbers for the names and the manufacturers."""
+    names = {}
+    manufacturers = {}
+    for i, (name, manufacturer, _, _) in enumerate(search_rows):
+        for gram in _trigrams(name):
+            names.setdefault(gram, set()).add(i)
+        for gram in _trigrams(manufacturer):
+            manufacturers.setdefault(gram, set()).add(i)
+    return names, manufacturers
+
+
+@dataclass(frozen=True, slots=True)
+class GdtfListing:
+    """The parsed GDTF Share listing and its indexes.
+
+    Only ever replaced as a whole, so a search can not mix the rows of one
+    data.json with the trigrams of another.
+    """
+
+    data: list = field(default_factory=list)
+    index: dict = field(default_factory=dict)  # rid: fixture
+    # the GDTF screen filter columns: lowercased name and manufacturer
+    # and the uploader, so the filters never look into the fixture dict
+    search_rows: list = field(default_factory=list)
+    trigrams: tuple | None = None  # (names, manufacturers), built on first use
+    key: tuple | None = None  # data.json (mtime_ns, size), None without it
+    cached: bool = False  # read from or saved to data.idx
+
+    @property
+    def mtime(self):
+        return None if self.key is None else self.key[0]
+
+
+IP_ADDRESS_TEXT = "IP Address: {}".format
+UNIVERSE_TEXT = "Universe: {}".format
+DMX_TEXT = "DMX: {}".format
+
+
+def layer_text(layer_name):
+    return Text.assemble("Layer: ", (str(layer_name), "blue"))
+
+
+def fixture_text(fixture):
+    """Text for a fixture row, shared by the rows with the same fields."""
+    return _fixture_text(
+        fixture.short_name, fixture.ip_address, fixture.universe, fixture.address
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _fixture_text(short_name, ip_address, universe, address):
+    return Text.assemble(
+        (str(short_name), "green"),
+        " ",
+        IP_ADDRESS_TEXT(ip_address) if ip_address else "",
+        " ",
+        UNIVERSE_TEXT(universe) if universe else "",
+        " ",
+        DMX_TEXT(address) if address else "",
+    )
+
+
+class MVRDisplay(OptionList):
+    """Layers and their fixtures as options, only the visible lines are rendered."""
+
+    BINDINGS = [
+        Binding("delete", "remove_fixture", "Remove fixture", show=False),
+        Binding("x", "remove_fixture", "Remove fixture", show=False),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (layer_id, index) per option, None for the layer headers
+        self._entries = []
+        self._layers = set()
+        self._last_layer = None
+
+    def update_items(self, new_entries):
+        """Append newly imported fixtures, new_entries is {layer_id: fixtures}."""
+        if any(
+            layer in self._layers and layer != self._last_layer for layer in new_entries
+        ):
+            # fixtures added to a layer higher up, rebuild to keep layer order
+            self.full_refresh(self.app.mvr_fixtures)
+            return
+
+        options = []
+        for layer, fixtures in new_entries.items():
+            if layer not in self._layers:
+                self._layers.add(layer)
+                self._last_layer = layer
+                options.append(self._layer_option(layer))
+                self._entries.append(None)
+            start = len(self.app.mvr_fixtures[layer]) - len(fixtures)
+            for index, fixture in enumerate(fixtures, start):
+                options.append(Option(fixture_text(fixture)))
+                self._entries.append((layer, index))
+        self.add_options(options)
+
+    def full_refresh(self, items):
+        """Rebuild the options from items, keeping the cursor and scroll position."""
+        highlighted = self.highlighted
+        scroll_y = self.scroll_y
+        options = []
+        entries = []
+        self._layers = set(items)
+        self._last_layer = None
+        for layer, fixtures in items.items():
+            options.append(self._layer_option(layer))
+            entries.append(None)
+            for index, fixture in enumerate(fixtures):
+                options.append(Option(fixture_text(fixture)))
+                entries.append((layer, index))
+            self._last_layer = layer
+        self._entries = entries
+        self.set_options(options)
+        if highlighted is not None and entries:
+            self.highlighted = min(highlighted, len(entries) - 1)
+        self.scroll_y = scroll_y
+
+    def _layer_option(self, layer):
+        return Option(layer_text(self.app.get_layer_name(layer)), disabled=True)
+
+    def action_remove_fixture(self) -> None:
+        if self.highlighted is None:
+            return
+        entry = self._entries[self.highlighted]
+        if entry is not None:
+            self.app.remove_mvr_fixture(*entry)
 
 
 class GDTFMapping(VerticalScroll):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._mounted = {}  # short_name -> GDTFMappedFixture
+        self._files_cache = None  # (directory mtime, data.json mtime, files list)
+        self._shown_files_list = None
+
     def get_fixture(self, rid):
-        if not self.app.gdtf_data:
-            data_file = Path("data.json")
-            if data_file.exists():
-                with open(data_file, "r") as f:
-                    self.app.gdtf_data = json.load(f)
-        for fixture in self.app.gdtf_data:
-            if str(fixture.get("rid")) == str(rid):
-                return fixture
-        return {}
+        return self.app.get_gdtf_fixture(rid)
 
     def create_label(self, stem):
-        sections = stem.split("@")
-        rid = sections[-1]
+        rid = stem.rsplit("@", 1)[-1]
         share_fixture = self.get_fixture(rid)
-        name = share_fixture.get("fixture", stem)
+        parts = [share_fixture.get("fixture", stem)]
         manufacturer = share_fixture.get("manufacturer")
+        if manufacturer:
+            parts.append(f" ({manufacturer})")
         revision = share_fixture.get("revision")
-        return (
-            f"{name}"
-            f"{f' ({manufacturer})' if manufacturer else ''}"
-            f"{f' {revision}' if revision else ''}"
-        )
-        return stem
-
-    def update_items(self):
-        self.remove_children()
+        if revision:
+            parts.append(f" {revision}")
+        return "".join(parts)
 
+    def get_gdtf_files_list(self):
+        """Labelled GDTF files, re-read only when the folder or data.json change."""
         path = Path("gdtf_files")
-
-        gdtf_files_list = sorted(
-            [
-                (self.create_label(p.stem), p.name)
-                for p in path.iterdir()
-                if p.suffix == ".gdtf"
-            ]
-        )
-
-        fixtures = set(
-            [
-                fixture.short_name
-                for layer in self.app.mvr_fixtures.values()
-                for fixture in layer
-            ]
-        )
-
-        for fixture in fixtures:
-            self.mount(GDTFMappedFixture(fixture, gdtf_files_list))
+        data_mtime = self.app.refresh_gdtf_data()
+        dir_mtime = path.stat().st_mtime_ns
+        if self._files_cache is not None and self._files_cache[:2] == (
+            dir_mtime,
+            data_mtime,
+        ):
+            return self._files_cache[2]
+
+        with os.scandir(path) as entries:
+            gdtf_files_list = sorted(
+                [
+                    (self.create_label(entry.name[:-5]), entry.name)
+                    for entry in entries
+                    if entry.name.endswith(".gdtf")
+                ]
+            )
+        self._files_cache = (dir_mtime, data_mtime, gdtf_files_list)
+        return gdtf_files_list
+
+    def update_items(self, new_short_names=None):
+        """Sync mapping rows with the app's short names.
+
+        With new_short_names only those rows are added, existing rows are
+        left alone unless the GDTF file list changed.
+        """
+        gdtf_files_list = self.get_gdtf_files_list()
+        fixtures = self.app.active_short_names
+
+        with self.app.batch_update():
+            if new_short_names is None:
+                stale = [name for name in self._mounted if name not in fixtures]
+                if stale:
+                    self.remove_children([self._mounted.pop(name) for name in stale])
+                new_short_names = fixtures
+
+            if gdtf_files_list is not self._shown_files_list:
+                self._shown_files_list = gdtf_files_list
+                for mapped in self._mounted.values():
+                    mapped.update_files(gdtf_files_list)
+
+            new_widgets = []
+            for fixture in new_short_names:
+                if fixture not in self._mounted:
+                    mapped = GDTFMappedFixture(fixture, gdtf_files_list)
+                    self._mounted[fixture] = mapped
+                    new_widgets.append(mapped)
+            if new_widgets:
+                self.mount_all(new_widgets)
 
 
 class GDTFMappedFixture(Horizontal):
@@ -126,7 +288,7 @@ class GDTFMappedFixture(Horizontal):
         super().__init__()
 
     def compose(self) -> ComposeResult:
-        yield Static(f"[green]{self.fixture}[/green]", id="gdtf_select")
+        yield Static(Text(str(self.fixture), "green"), id="gdtf_select")
         yield Select(options=self.gdtf_files_list, id="select_gdtf", compact=False)
 
     def on_mount(self):
@@ -134,6 +296,16 @@ class GDTFMappedFixture(Horizontal):
             select = self.query_one("#select_gdtf")
             select.value = self.app.gdtf_map[self.fixture]
 
+    def update_files(self, gdtf_files_list):
+        if gdtf_files_list is self.gdtf_files_list:
+            return
+        self.gdtf_files_list = gdtf_files_list
+        select = self.query_one("#select_gdtf", Select)
+        select.set_options(gdtf_files_list)
+        mapped = self.app.gdtf_map.get(self.fixture)
+        if mapped in {name for _, name in gdtf_files_list}:
+            select.value = mapped
+
     def on_select_changed(self, event: Select.Changed):
         if str(event.value) and str(event.value) != "Select.BLANK":
             self.app.gdtf_map[self.fixture] = event.value
@@ -164,21 +336,44 @@ class PollToMVR(App):
     ]
 
     CONFIG_FILE = "config.json"
+    GDTF_DATA_FILE = "data.json"
+    GDTF_CACHE_FILE = "data.idx"
+    # the only GDTF Share listing fields used, the rest is dropped at load
+    GDTF_DATA_FIELDS = (
+        "rid",
+        "fixture",
+        "manufacturer",
+        "revision",
+        "uploader",
+        "creator",
+    )
     KEYRING_SERVICE = APP_NAME
     KEYRING_USERNAME_KEY = "gdtf_username"
     KEYRING_PASSWORD_KEY = "gdtf_password"
-    configuration = SimpleNamespace(
-        artnet_timeout="1",
-        show_debug=False,
-        show_link_local_addresses=False,
-        gdtf_username="",
-        gdtf_password="",
-    )
-
-    mvr_fixtures = {}
-    mvr_layers = [("Default", str(py_uuid.uuid4()))]
-    gdtf_map = {}
-    gdtf_data = []
+    DEFAULT_CONFIGURATION = {
+        "artnet_timeout": "1",
+        "show_debug": False,
+        "show_link_local_addresses": False,
+        "gdtf_username": "",
+        "gdtf_password": "",
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.configuration = SimpleNamespace(**self.DEFAULT_CONFIGURATION)
+        self._saved_configuration = None
+        self._loaded_credentials = None  # (username, password) read by the worker
+        self._credentials_applied = False
+        self._config_lock = threading.Lock()
+        self.mvr_display = None
+        self.gdtf_mapping = None
+        default_layer_id = str(py_uuid.uuid4())
+        self.mvr_fixtures = {}
+        self.mvr_layers = [("Default", default_layer_id)]
+        self._layer_names = {default_layer_id: "Default"}
+        self.gdtf_map = {}
+        self.gdtf_listing = GdtfListing()
+        self._short_name_counts = Counter()
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
@@ -187,16 +382,13 @@ class PollToMVR(App):
             with Horizontal():
                 with Vertical(id="mvr_data"):
                     yield Static("[b]MVR data:[/b]")
-                    self.mvr_display = MVRDisplay()
-                    yield self.mvr_display
                 with Vertical(id="gdtf_mapping"):
                     yield Static("[b]GDTF Mapping:[/b]")
-                    self.gdtf_mapping = GDTFMapping()
-                    yield self.gdtf_mapping
 
             with Grid(id="action_buttons"):
                 yield Button("Discover", id="network_discovery")
-                yield Button("Save MVR", id="save_mvr", disabled=True)
+                self._save_button = Button("Save MVR", id="save_mvr", disabled=True)
+                yield self._save_button
                 yield Button("GDTF Files", id="gdtf_files")
                 yield Button("Configure", id="configure_button")
                 yield Button("Quit", variant="error", id="quit")
@@ -206,120 +398,368 @@ class PollToMVR(App):
         path = Path("gdtf_files")
         path.mkdir(parents=True, exist_ok=True)
         config_data = {}
-        if os.path.exists(self.CONFIG_FILE):
-            with open(self.CONFIG_FILE, "r") as f:
-                try:
-                    config_data = json.load(f)
-                    vars(self.configuration).update(config_data)
-                    self.notify("Configuration loaded...", timeout=1)
+        try:
+            with open(self.CONFIG_FILE, "rb") as f:
+                config_data = json_loads(f.read())
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            # Handle empty or invalid JSON file
+            pass
+        else:
+            vars(self.configuration).update(config_data)
+            self.notify("Configuration loaded...", timeout=1)
+        self._saved_configuration = vars(self.configuration).copy()
+        self._load_credentials_worker(config_data)
+        self._button_handlers = {
+            "gdtf_files": self._on_gdtf_files,
+            "network_discovery": self._on_network_discovery,
+            "configure_button": self._on_configure,
+            "quit": self._on_quit,
+        }
+        self.call_after_refresh(self._prewarm_imports)
+        self.call_after_refresh(self._prewarm_network_cards)
 
-                except json.JSONDecodeError:
-                    # Handle empty or invalid JSON file
-                    pass
-        migrated = self._load_credentials(config_data)
-        if migrated:
-            with open(self.CONFIG_FILE, "w") as f:
-                json.dump(config_data, f, indent=4)
-            self.notify("Credentials moved to system keyring.", timeout=2)
+    @work(thread=True)
+    def _prewarm_imports(self) -> None:
+        """Import pymvr in the background so the first Save MVR is quick."""
+        import tui.create_mvr
+
+    @work(thread=True)
+    def _prewarm_network_cards(self) -> None:
+        """List the interfaces in the background so discovery opens ready."""
+        cached_network_cards(self.configuration.show_link_local_addresses)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Called when a button is pressed."""
-        if event.button.id == "gdtf_files":
-            self.push_screen(GDTFScreen())
-
-        if event.button.id == "delete_tags":
-            self.query_one("#json_output").update(
-                "Calling API via script, adding monitors..."
-            )
-
-        if event.button.id == "network_discovery":
-
-            def layer_selector(discovered):
-                if discovered:
-                    self.push_screen(
-                        ImportDiscovery(data=discovered), import_discovered
-                    )
-
-            def import_discovered(data):
-                if data:
-                    self.query_one("#save_mvr").disabled = False
-                    layer_id = data.get("layer_id", None)
-                    layer_name = data.get("layer_name", None)
-                    devices = data.get("devices", [])
-                    if not devices:
-                        return
-                    if layer_id and layer_id == "new_layer" and layer_name:
-                        layer_uuid = str(py_uuid.uuid4())
-                        self.mvr_layers.append((layer_name, layer_uuid))
-                    else:
-                        layer_uuid = layer_id
-                    if layer_uuid not in self.mvr_fixtures:
-                        self.mvr_fixtures[layer_uuid] = []
-                    self.mvr_fixtures[layer_uuid] += devices
-
-                    self.mvr_display.update_items(self.mvr_fixtures)
-                    self.gdtf_mapping.update_items()
-                    self._update_save_button_state()
-
-            self.push_screen(ArtNetScreen(), layer_selector)
-
-        if event.button.id == "configure_button":
-            self.push_screen(ConfigScreen())
-
-        if event.button.id == "quit":
-
-            def check_quit(quit_confirmed: bool) -> None:
-                """Called with the result of the quit dialog."""
-                if quit_confirmed:
-                    self.action_quit()
-
-            self.push_screen(QuitScreen(), check_quit)
+        handler = self._button_handlers.get(event.button.id)
+        if handler is not None:
+            handler()
+
+    def _on_gdtf_files(self) -> None:
+        from tui.gdtf_share.gdtf import GDTFScreen
+
+        self.push_screen(GDTFScreen())
+
+    def _on_network_discovery(self) -> None:
+        self.push_screen(ArtNetScreen(), self._layer_selector)
+
+    def _layer_selector(self, discovered) -> None:
+        if discovered:
+            self.push_screen(ImportDiscovery(data=discovered), self._import_discovered)
+
+    def _import_discovered(self, data) -> None:
+        if data:
+            layer_id = data.get("layer_id", None)
+            layer_name = data.get("layer_name", None)
+            devices = data.get("devices", [])
+            if not devices:
+                return
+            if layer_id and layer_id == "new_layer" and layer_name:
+                layer_uuid = str(py_uuid.uuid4())
+                self.mvr_layers.append((layer_name, layer_uuid))
+                self._layer_names[layer_uuid] = layer_name
+            else:
+                layer_uuid = layer_id
+            self.mvr_fixtures.setdefault(layer_uuid, []).extend(devices)
+            counts = self._short_name_counts
+            new_short_names = {
+                device.short_name
+                for device in devices
+                if device.short_name not in counts
+            }
+            counts.update(device.short_name for device in devices)
+
+            # both panes reflow once for the whole import
+            with self.batch_update():
+                self._mount_displays()
+                self.mvr_display.update_items({layer_uuid: devices})
+                self.gdtf_mapping.update_items(new_short_names)
+                self._update_save_button_state()
+
+    def _on_configure(self) -> None:
+        self.push_screen(ConfigScreen())
+
+    def _on_quit(self) -> None:
+        self.push_screen(QuitScreen(), self._check_quit)
+
+    def _check_quit(self, quit_confirmed: bool) -> None:
+        """Called with the result of the quit dialog."""
+        if quit_confirmed:
+            self.action_quit()
 
     def action_save_config(self) -> None:
         """Save the configuration to the JSON file."""
-        config_data = vars(self.app.configuration).copy()
-        self._persist_credentials(config_data)
-        with open(self.CONFIG_FILE, "w") as f:
-            json.dump(config_data, f, indent=4)
+        config_data = self._changed_configuration()
+        if config_data is not None:
+            self._save_config_worker(config_data, self._credentials_applied)
+
+    def _changed_configuration(self):
+        """Snapshot of the configuration, None if it was saved already."""
+        config_data = vars(self.configuration).copy()
+        if config_data == self._saved_configuration and os.path.exists(
+            self.CONFIG_FILE
+        ):
+            return None  # nothing changed since the last load/save
+        self._saved_configuration = config_data.copy()
+        return config_data
+
+    @work(thread=True, group="config")
+    def _save_config_worker(self, config_data, credentials_applied) -> None:
+        """Save in a thread, the keyring backends can take a while to answer."""
+        self._save_config(config_data, credentials_applied)
+
+    def _save_config(self, config_data, credentials_applied) -> None:
+        with self._config_lock:
+            if not credentials_applied and self._loaded_credentials is not None:
+                # snapshot taken before the UI thread got what the worker read
+                username, password = self._loaded_credentials
+                config_data["gdtf_username"] = username
+                config_data["gdtf_password"] = password
+                credentials_applied = True
+            if credentials_applied:
+                self._persist_credentials(config_data)
+            self._write_config(config_data)
+
+    def _write_config(self, config_data) -> None:
+        """Write config.json atomically via a temporary file."""
+        if orjson:
+            data = orjson.dumps(config_data)
+        else:
+            data = json.dumps(config_data, separators=(",", ":")).encode()
+        tmp_file = f"{self.CONFIG_FILE}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, self.CONFIG_FILE)
 
     def action_quit(self) -> None:
         """Save the configuration to the JSON file when the app closes."""
-        self.action_save_config()
+        config_data = self._changed_configuration()
+        if config_data is not None:
+            # not in a worker, we are exiting
+            self._save_config(config_data, self._credentials_applied)
         self.exit()
 
     def get_layer_name(self, uuid):
-        for layer_name, layer_id in self.mvr_layers:
-            if layer_id == uuid:
-                return layer_name
-        return None
+        return self._layer_names.get(uuid)
+
+    def load_gdtf_data(self) -> None:
+        """Load the GDTF Share listing and index it by revision id."""
+        self.gdtf_listing = self.read_gdtf_listing()
+
+    def read_gdtf_listing(self) -> GdtfListing:
+        """Parse data.json, or restore it from the cache, into a new listing."""
+        data_file = Path(self.GDTF_DATA_FILE)
+        try:
+            stat = data_file.stat()
+        except OSError:
+            stat = None
+        if stat is not None:
+            listing = self._load_gdtf_cache(stat)
+            if listing is not None:
+                return listing
+        try:
+            with open(data_file, "rb") as f:
+                raw = f.read()
+        except OSError:
+            stat, raw = None, b"[]"
+        fields = self.GDTF_DATA_FIELDS
+        data = [
+            {key: fixture[key] for key in fields if key in fixture}
+            for fixture in json_loads(raw)
+        ]
+        return GdtfListing(
+            data=data,
+            index={str(fixture.get("rid")): fixture for fixture in data},
+            search_rows=[
+                (
+                    (fixture.get("fixture") or "").lower(),
+                    (fixture.get("manufacturer") or "").lower(),
+                    fixture.get("uploader"),
+                    fixture,
+                )
+                for fixture in data
+            ],
+            key=None if stat is None else (stat.st_mtime_ns, stat.st_size),
+        )
+
+    def prepare_gdtf_listing(self, reload=False) -> GdtfListing:
+        """The current or reloaded listing with its trigrams, for a worker.
+
+        Nothing on the app is changed, the worker hands the result to the UI
+        thread which replaces gdtf_listing with it.
+        """
+        listing = self.gdtf_listing
+        if reload or self.gdtf_data_changed(listing):
+            listing = self.read_gdtf_listing()
+        if listing.trigrams is None:
+            listing = replace(listing, trigrams=_build_trigrams(listing.search_rows))
+        if not listing.cached and self._write_gdtf_cache(listing):
+            listing = replace(listing, cached=True)
+        return listing
+
+    def _load_gdtf_cache(self, stat) -> GdtfListing | None:
+        """Restore the parsed listing and its indexes if data.json is unchanged."""
+        key = (stat.st_mtime_ns, stat.st_size)
+        # marshal only builds plain values, loading a tampered file runs no code
+        try:
+            with open(self.GDTF_CACHE_FILE, "rb") as f:
+                cache = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None  # missing or broken cache, parse data.json
+        if (
+            not isinstance(cache, dict)
+            or cache.get("version") != (GDTF_CACHE_VERSION, marshal.version)
+            or cache.get("key") != key
+        ):
+            return None
+        try:
+            return GdtfListing(
+                data=cache["data"],
+                index=cache["index"],
+                search_rows=cache["search_rows"],
+                trigrams=cache["trigrams"],
+                key=key,
+                cached=True,
+            )
+        except KeyError:
+            return None
+
+    def _write_gdtf_cache(self, listing: GdtfListing) -> bool:
+        if listing.key is None:
+            return False
+        cache = {
+            "version": (GDTF_CACHE_VERSION, marshal.version),
+            "key": listing.key,
+            "data": listing.data,
+            "index": listing.index,
+            "search_rows": listing.search_rows,
+            "trigrams": listing.trigrams,
+        }
+        tmp_file = f"{self.GDTF_CACHE_FILE}.tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                marshal.dump(cache, f)
+            os.replace(tmp_file, self.GDTF_CACHE_FILE)
+        except OSError as e:
+            self.log(f"Could not write {self.GDTF_CACHE_FILE}: {e}")
+            return False
+        return True
+
+    def gdtf_data_changed(self, listing: GdtfListing) -> bool:
+        """Whether data.json is not the file the listing was read from."""
+        try:
+            mtime = Path(self.GDTF_DATA_FILE).stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        return mtime != listing.mtime or bool(mtime and not listing.data)
+
+    def refresh_gdtf_data(self):
+        """Reload the GDTF Share listing if data.json changed, return its mtime."""
+        if self.gdtf_data_changed(self.gdtf_listing):
+            self.load_gdtf_data()
+        return self.gdtf_listing.mtime
+
+    def search_gdtf_data(self, name_filter, manufacturer_filter, uploader=None):
+        """GDTF Share fixtures containing the lowercased filters, in listing order.
+
+        Filters of three or more characters are first narrowed down via the
+        trigram index, the substring check then runs on the candidates only.
+        Without any filter this is the listing data itself, do not modify the
+        result.
+        """
+        if not name_filter and not manufacturer_filter and uploader is None:
+            return self.gdtf_listing.data
+        # rows and trigrams from the same listing
+        listing = self.indexed_gdtf_listing()
+        rows = listing.search_rows
+        names, manufacturers = listing.trigrams
+        postings = []
+        for query, index in (
+            (name_filter, names),
+            (manufacturer_filter, manufacturers),
+        ):
+            for gram in _trigrams(query):
+                posting = index.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+        if postings:
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            rows = [rows[i] for i in sorted(candidates)]
+        # only the active checks run, chained lazily so that only the
+        # result list is built; a three character filter is already matched
+        # exactly by its trigram
+        if name_filter and len(name_filter) != 3:
+            rows = (row for row in rows if name_filter in row[0])
+        if manufacturer_filter and len(manufacturer_filter) != 3:
+            rows = (row for row in rows if manufacturer_filter in row[1])
+        if uploader is not None:
+            return [fixture for _, _, up, fixture in rows if up == uploader]
+        return [fixture for _, _, _, fixture in rows]
+
+    def indexed_gdtf_listing(self) -> GdtfListing:
+        """The listing, with its trigrams built on first use.
+
+        No cache is written here, this runs on the UI thread; data.idx is
+        only written by prepare_gdtf_listing in the GDTF screen worker.
+        """
+        listing = self.gdtf_listing
+        if listing.trigrams is None:
+            listing = replace(listing, trigrams=_build_trigrams(listing.search_rows))
+            self.gdtf_listing = listing
+        return listing
+
+    def get_gdtf_fixture(self, rid):
+        if self.gdtf_listing.key is None:
+            self.refresh_gdtf_data()  # not loaded yet, or there is no data.json
+        return self.gdtf_listing.index.get(str(rid), {})
+
+    def _mount_displays(self) -> None:
+        """Mount the MVR and GDTF mapping lists when the first fixtures arrive."""
+        if self.mvr_display is not None:
+            return
+        self.mvr_display = MVRDisplay()
+        mvr_data = self.query_one("#mvr_data")
+        mvr_data.border_subtitle = "x/del: remove fixture"
+        mvr_data.mount(self.mvr_display)
+        self.gdtf_mapping = GDTFMapping()
+        self.query_one("#gdtf_mapping").mount(self.gdtf_mapping)
 
     def remove_mvr_fixture(self, layer_id, index) -> None:
         fixtures = self.mvr_fixtures.get(layer_id, [])
         if index < 0 or index >= len(fixtures):
             return
-        fixtures.pop(index)
+        fixture = fixtures.pop(index)
+        counts = self._short_name_counts
+        counts[fixture.short_name] -= 1
+        if counts[fixture.short_name] <= 0:
+            del counts[fixture.short_name]
         if not fixtures:
             self.mvr_fixtures.pop(layer_id, None)
         self._cleanup_gdtf_map()
-        self.mvr_display.update_items(self.mvr_fixtures)
-        self.gdtf_mapping.update_items()
-        self._update_save_button_state()
+        with self.batch_update():
+            self.mvr_display.full_refresh(self.mvr_fixtures)
+            self.gdtf_mapping.update_items()
+            self._update_save_button_state()
+
+    @property
+    def active_short_names(self):
+        """Short names of all fixtures currently in the MVR layers."""
+        return self._short_name_counts.keys()
 
     def _cleanup_gdtf_map(self) -> None:
-        active_fixtures = {
-            fixture.short_name
-            for layer in self.mvr_fixtures.values()
-            for fixture in layer
-        }
         for name in list(self.gdtf_map.keys()):
-            if name not in active_fixtures:
+            if name not in self._short_name_counts:
                 self.gdtf_map.pop(name, None)
 
     def _update_save_button_state(self) -> None:
-        save_button = self.query_one("#save_mvr", Button)
-        save_button.disabled = not any(self.mvr_fixtures.values())
+        # empty layers are dropped, so any counted name means a fixture
+        self._save_button.disabled = not self._short_name_counts
 
     def _keyring_get(self, key):
+        keyring, KeyringError = _import_keyring()
         if not keyring:
             return None
         try:
@@ -328,6 +768,7 @@ class PollToMVR(App):
             return None
 
     def _keyring_set(self, key, value):
+        keyring, KeyringError = _import_keyring()
         if not keyring:
             return False
         try:
@@ -342,6 +783,25 @@ class PollToMVR(App):
         except KeyringError:
             return False
 
+    @work(thread=True, group="config")
+    def _load_credentials_worker(self, config_data) -> None:
+        with self._config_lock:
+            username, password, migrated = self._load_credentials(config_data)
+            if migrated:
+                self._write_config(config_data)
+            # set under the lock, a save right after must not write plaintext
+            self._loaded_credentials = username, password
+        self.call_from_thread(self._apply_credentials, username, password, migrated)
+
+    def _apply_credentials(self, username, password, migrated) -> None:
+        self.configuration.gdtf_username = username
+        self.configuration.gdtf_password = password
+        self._saved_configuration["gdtf_username"] = username
+        self._saved_configuration["gdtf_password"] = password
+        self._credentials_applied = True
+        if migrated:
+            self.notify("Credentials moved to system keyring.", timeout=2)
+
     def _load_credentials(self, config_data):
         migrated = False
         username = self._keyring_get(self.KEYRING_USERNAME_KEY)
@@ -363,28 +823,27 @@ class PollToMVR(App):
             username = config_username
         if password is None:
             password = config_password
-        self.configuration.gdtf_username = username or ""
-        self.configuration.gdtf_password = password or ""
-        return migrated
+        return username or "", password or "", migrated
 
     def _persist_credentials(self, config_data):
-        stored_user = self._keyring_set(
-            self.KEYRING_USERNAME_KEY, self.configuration.gdtf_username
-        )
-        stored_pass = self._keyring_set(
-            self.KEYRING_PASSWORD_KEY, self.configuration.gdtf_password
-        )
+        username = config_data.get("gdtf_username", "")
+        password = config_data.get("gdtf_password", "")
+        stored_user = self._keyring_set(self.KEYRING_USERNAME_KEY, username)
+        stored_pass = self._keyring_set(self.KEYRING_PASSWORD_KEY, password)
         if stored_user and stored_pass:
             config_data.pop("gdtf_username", None)
             config_data.pop("gdtf_password", None)
         else:
-            config_data["gdtf_username"] = self.configuration.gdtf_username
-            config_data["gdtf_password"] = self.configuration.gdtf_password
+            config_data["gdtf_username"] = username
+            config_data["gdtf_password"] = password
 
     @on(Button.Pressed)
     @work
     async def save_a_file(self, event: Button.Pressed) -> None:
         if event.button.id == "save_mvr":
+            from textual_fspicker import FileSave, Filters
+            from tui.create_mvr import create_mvr
+
             if save_to := await self.app.push_screen_wait(
                 FileSave(
                     default_file="discovered.mvr",
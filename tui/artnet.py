@@ -15,12 +15,44 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import selectors
 import socket
 import struct
 import time
 
 
 ARTNET_PORT = 6454
+ARTNET_ID = b"Art-Net\x00"
+OP_POLL = 0x2000
+OP_POLL_REPLY = 0x2100
+
+ARTPOLL_PACKET = (
+    ARTNET_ID
+    + struct.pack("<H", OP_POLL)  # OpCode
+    + struct.pack(">H", 14)  # Protocol version
+    + b"\x01"  # TalkToMe
+    + b"\x00"  # Priority
+)
+
+# IP address, 12 bytes of port/version/oem fields, short name, long name
+_REPLY = struct.Struct("<4s12x17sx127s")
+_REPLY_END = 10 + _REPLY.size
+
+
+class ArtPollProtocol(asyncio.DatagramProtocol):
+    def __init__(self, discovery, replies: asyncio.Queue):
+        self.discovery = discovery
+        self.devices = {}
+        self.replies = replies
+
+    def datagram_received(self, data, addr):
+        device = self.discovery._add_reply(self.devices, data, addr)
+        if device is not None:
+            self.replies.put_nowait(device)
+
+    def error_received(self, exc):
+        print(exc)
 
 
 class ArtNetDiscovery:
@@ -51,49 +83,92 @@ class ArtNetDiscovery:
         self.socket.sendto(artpoll, ("<broadcast>", ARTNET_PORT))
 
         devices = {}
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            try:
-                self.socket.settimeout(0.1)
-                data, addr = self.socket.recvfrom(1024)
-
-                if self._is_artpoll_reply(data):
-                    device = self._parse_artpoll_reply(data, addr)
-                    if device:
-                        if device["reported_ip"] not in devices:
-                            devices[device["reported_ip"]] = device
-
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(e)
+        deadline = time.monotonic() + timeout
+
+        self.socket.setblocking(False)
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.socket, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    break
+                # replies arrive in bursts, drain all queued ones per wakeup
+                while True:
+                    try:
+                        data, addr = self.socket.recvfrom(1024)
+                    except BlockingIOError:
+                        break
+                    except Exception as e:
+                        print(e)
+                        break
+
+                    self._add_reply(devices, data, addr)
 
         device_list = list(devices.values())
         return device_list
 
+    async def discover_devices_async(self, timeout: float = 1.5):
+        """Like discover_devices, but waits for the replies on the running loop."""
+        return [device async for device in self.iter_devices(timeout)]
+
+    async def iter_devices(self, timeout: float = 1.5):
+        """Yields each replying device as soon as its reply arrives."""
+        loop = asyncio.get_running_loop()
+        replies = asyncio.Queue()
+        self.socket.setblocking(False)
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: ArtPollProtocol(self, replies), sock=self.socket
+        )
+        deadline = loop.time() + timeout
+        try:
+            transport.sendto(
+                self._create_artpoll_packet(), ("<broadcast>", ARTNET_PORT)
+            )
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        device = await replies.get()
+                except TimeoutError:
+                    break
+                yield device
+        finally:
+            transport.close()
+
+    def _add_reply(self, devices: dict, data: bytes, addr: tuple):
+        """Adds a reply to devices, returns the device if it is a new one."""
+        if not self._is_artpoll_reply(data):
+            return None
+        # devices with several ports reply once per port, skip the repeats
+        if len(data) >= 14 and socket.inet_ntoa(data[10:14]) in devices:
+            return None
+        device = self._parse_artpoll_reply(data, addr)
+        if device and device["reported_ip"] not in devices:
+            devices[device["reported_ip"]] = device
+            return device
+        return None
+
     def _create_artpoll_packet(self):
-        packet = b"Art-Net\x00"  # ID
-        packet += struct.pack("<H", 0x2000)  # OpCode (ArtPoll)
-        packet += struct.pack(">H", 14)  # Protocol version
-        packet += b"\x01"  # TalkToMe
-        packet += b"\x00"  # Priority
-        return packet
+        return ARTPOLL_PACKET
 
     def _is_artpoll_reply(self, data: bytes):
         return (
             len(data) >= 10
-            and data.startswith(b"Art-Net\x00")
-            and struct.unpack("<H", data[8:10])[0] == 0x2100
+            and data.startswith(ARTNET_ID)
+            and (data[8] | data[9] << 8) == OP_POLL_REPLY
         )
 
     def _parse_artpoll_reply(self, data: bytes, addr: tuple):
         """Parse ArtPollReply packet."""
         try:
-            ip_bytes = data[10:14]
-            reported_ip = f"{ip_bytes[0]}.{ip_bytes[1]}.{ip_bytes[2]}.{ip_bytes[3]}"
-            short_name = data[26:43].decode("ascii", errors="ignore").strip("\x00")
-            long_name = data[44:171].decode("ascii", errors="ignore").strip("\x00")
+            if len(data) < _REPLY_END:
+                # some old nodes send truncated replies, keep what is there
+                data = data.ljust(_REPLY_END, b"\x00")
+            ip_bytes, short_raw, long_raw = _REPLY.unpack_from(data, 10)
+            reported_ip = socket.inet_ntoa(ip_bytes)
+            short_name = short_raw.partition(b"\x00")[0].decode(
+                "ascii", errors="ignore"
+            )
+            long_name = long_raw.partition(b"\x00")[0].decode("ascii", errors="ignore")
 
             return {
                 "reported_ip": reported_ip,
@@ -18,11 +18,22 @@
 import pymvr
 from pathlib import Path
 
+GDTF_DIR = Path("gdtf_files")
+WRITE_BUFFER_SIZE = 1 << 20
 
-def get_layer_name(uuid, mvr_layers):
-    for layer_name, layer_id in mvr_layers:
-        if layer_id == uuid:
-            return layer_name
+
+def _to_int(value, default):
+    """Int value of a discovered address or universe, default if it is not a number.
+
+    Strings come from parsed device names, "0" there is a real universe 0.
+    """
+    if isinstance(value, int):
+        return value or default
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdecimal() or (value[:1] == "-" and value[1:].isdecimal()):
+            return int(value)
+    return default
 
 
 def create_mvr(devices, mvr_layers, gdtf_map, save_to):
@@ -32,10 +43,11 @@ def create_mvr(devices, mvr_layers, gdtf_map, save_to):
     layers = pymvr.Layers()
     scene_obj.layers = layers
     scene_obj.aux_data = aux_data
-    files_to_pack = []
+    files_to_pack = {}  # gdtf_spec -> path, in first use order
+    layer_names = {layer_id: layer_name for layer_name, layer_id in mvr_layers}
 
     for layer_uuid, fixtures in devices.items():
-        layer_name = get_layer_name(layer_uuid, mvr_layers)
+        layer_name = layer_names.get(layer_uuid)
 
         layer = pymvr.Layer(name=layer_name, uuid=layer_uuid)
         layers.append(layer)
@@ -55,19 +67,12 @@ def create_mvr(devices, mvr_layers, gdtf_map, save_to):
                     pymvr.Network(ipv4=net_fixture.ip_address)
                 )
 
-            if fixture.gdtf_spec:
-                files_to_pack.append(
-                    (Path("gdtf_files") / fixture.gdtf_spec, fixture.gdtf_spec)
-                )
+            if fixture.gdtf_spec and fixture.gdtf_spec not in files_to_pack:
+                files_to_pack[fixture.gdtf_spec] = GDTF_DIR / fixture.gdtf_spec
 
             if net_fixture.address is not None:
-                address = 1
-                universe = 1
-                try:
-                    address = int(net_fixture.address or 1)
-                    universe = int(net_fixture.universe or 1)
-                except:
-                    ...
+                address = _to_int(net_fixture.address, 1)
+                universe = _to_int(net_fixture.universe, 1)
                 fixture.addresses.addresses.append(
                     pymvr.Address(
                         dmx_break=0,
@@ -79,6 +84,8 @@ def create_mvr(devices, mvr_layers, gdtf_map, save_to):
             child_list.fixtures.append(fixture)
 
     scene_obj.to_xml(parent=mvr_writer.xml_root)
-    mvr_writer.files_list = list(set(files_to_pack))
+    mvr_writer.files_list = [(path, name) for name, path in files_to_pack.items()]
     output_path = save_to.with_suffix(".mvr")
-    mvr_writer.write_mvr(output_path)
+    # pymvr hands this to ZipFile, a large buffer coalesces the zip writes
+    with open(output_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        mvr_writer.write_mvr(f)
@@ -16,7 +16,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from textual.message import Message
-from textual.screen import ModalScreen
 from textual.app import ComposeResult
 from textual.containers import (
     Horizontal,
@@ -25,17 +24,27 @@ from textual.containers import (
     VerticalScroll,
 )
 from textual.widgets import Button, Static, Input, Select
-from textual import work, events
+from textual import work
+from tui.screens import DialogScreen
 from tui.share_api_client import update_data, download_files
 from pathlib import Path
-import json
-import asyncio
+import os
+from itertools import zip_longest
 
 
-class FileDownloaded(Message): ...
+class FileDownloaded(Message):
+    __slots__ = ()
 
 
-class ShareUpdated(Message): ...
+class ShareUpdated(Message):
+    __slots__ = ()
+
+
+def share_label(fixture):
+    return (
+        f"{fixture.get('fixture')} ({fixture.get('manufacturer')}) "
+        f"{'🏭' if fixture.get('uploader') == 'Manuf.' else '🧑'} {fixture.get('revision')}"
+    )
 
 
 class LocalFile(HorizontalGroup):
@@ -77,9 +86,6 @@ class GDTFFile(HorizontalGroup):
     creator = ""
     manufacturer_file = False
 
-    def callback(self, function, result):
-        function(result)
-
     def downloaded(self, result):
         if result.status:
             self.post_message(FileDownloaded())
@@ -88,20 +94,25 @@ class GDTFFile(HorizontalGroup):
             self.notify(f"Failed, status: {result.result.status_code}", timeout=1)
 
     def __init__(self, fixture=None):
-        if fixture:
-            self.fixture = fixture
-            self.name = fixture.get("fixture")
-            self.brand = fixture.get("manufacturer")
-            self.manufacturer_file = fixture.get("uploader") == "Manuf."
-            self.creator = fixture.get("creator")
-            self.revision = fixture.get("revision")
         super().__init__()
+        self.label = Static("", id="name")
+        if fixture:
+            self.set_fixture(fixture)
+
+    def set_fixture(self, fixture, label=None):
+        """Show another share fixture in this row."""
+        if fixture is self.fixture:
+            return
+        self.fixture = fixture
+        self.name = fixture.get("fixture")
+        self.brand = fixture.get("manufacturer")
+        self.manufacturer_file = fixture.get("uploader") == "Manuf."
+        self.creator = fixture.get("creator")
+        self.revision = fixture.get("revision")
+        self.label.update(label or share_label(fixture))
 
     def compose(self):
-        yield Static(
-            f"{self.name} ({self.brand}) {'🏭' if self.manufacturer_file else '🧑'} {self.revision}",
-            id="name",
-        )
+        yield self.label
         yield Button("Download", id="download")
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
@@ -119,24 +130,18 @@ class GDTFFile(HorizontalGroup):
                 self.app.configuration.gdtf_password,
                 file_path,
                 [self.fixture],
-                self.callback,
                 self.downloaded,
                 self.screen.data_file,
             )
 
 
-class GDTFScreen(ModalScreen):
+class GDTFScreen(DialogScreen):
     """Screen with a dialog to confirm quitting."""
 
-    BINDINGS = [
-        ("left", "focus_previous", "Focus Previous"),
-        ("right", "focus_next", "Focus Next"),
-        ("up", "focus_previous", "Focus Previous"),
-        ("down", "focus_next", "Focus Next"),
-    ]
-
     data_file = Path("data.json")
-    debounce_task = None
+    debounce_timer = None
+    SHARE_LISTING_SIZE = 50  # rows mounted at once, the listing is windowed
+    SHARE_ROW_HEIGHT = 3  # GDTFFile height in app.css
 
     def compose(self) -> ComposeResult:
         with Vertical(id="all_around"):
@@ -166,7 +171,17 @@ class GDTFScreen(ModalScreen):
                 )
             with Horizontal():
                 with VerticalScroll(id="listing_share"):
-                    yield Static("...")
+                    yield Static("...", id="share_header")
+                    # only a window of the results is mounted, the spacers
+                    # stand in for the rows above and below it
+                    yield Static(classes="share_spacer", id="share_above")
+                    self._share_rows = [
+                        GDTFFile() for _ in range(self.SHARE_LISTING_SIZE)
+                    ]
+                    for row in self._share_rows:
+                        row.display = False
+                        yield row
+                    yield Static(classes="share_spacer", id="share_below")
                 with VerticalScroll(id="listing_local"):
                     yield Static("...")
 
@@ -174,81 +189,143 @@ class GDTFScreen(ModalScreen):
         self.refresh_share_listing()
 
     def on_input_changed(self, event: Input.Changed):
-        if self.debounce_task and not self.debounce_task.done():
-            self.debounce_task.cancel()
-
-        self.debounce_task = asyncio.create_task(self.debounced_update(event.value))
-
-    async def debounced_update(self, value: str):
-        await asyncio.sleep(0.25)
-        self.refresh_share_listing()
+        if self.debounce_timer is not None:
+            self.debounce_timer.stop()
+        self.debounce_timer = self.set_timer(0.25, self.refresh_share_listing)
 
     def on_mount(self):
-        self.app.gdtf_data = []
-        if self.data_file.exists():
-            with open(self.data_file, "r") as f:
-                self.app.gdtf_data = json.load(f)
-        self.refresh_share_listing()
-        self.refresh_local_listing()
+        self._filtered = []
+        self._share_first = 0
+        self._share_pending = None  # window start waiting for the next refresh
+        self._share_labels = {}  # rid -> row label, cleared when data reloads
+        self._local_mtime = None
+        self._local_files = {}  # path -> LocalFile
+        listing = self.query_one("#listing_share")
+        self.watch(listing, "scroll_y", self._on_share_scroll, init=False)
+        self.load_share_data()
         self.set_focus(self.query_one("#filter_filename"))
 
-    def refresh_share_listing(self):
-        listing = self.query_one("#listing_share")
-        listing.remove_children()
+    @work(thread=True, exclusive=True, group="share_data")
+    def load_share_data(self, reload=False) -> None:
+        """Parse data.json and build the search index off the UI thread."""
+        listing = self.app.prepare_gdtf_listing(reload)
+        # replaced in one assignment on the UI thread, where the searches run
+        self.app.call_from_thread(self.share_data_loaded, listing, reload)
+
+    def share_data_loaded(self, listing, reload) -> None:
+        self.app.gdtf_listing = listing
+        self._share_labels.clear()
+        if reload and self.query_one("#filter_manufacturer").value != "":
+            self.query_one("#filter_filename").value = self.query_one(
+                "#filter_manufacturer"
+            ).value = ""  # this will cause data refresh
+        else:
+            self.refresh_share_listing()
+        self.refresh_local_listing(reload=True)
 
+    def refresh_share_listing(self):
         filter_uploader = self.query_one("#uploader").value
-        filter_filename = self.query_one("#filter_filename").value
-        filter_manufacturer = self.query_one("#filter_manufacturer").value
-
-        filters = []
-
-        if filter_filename:
-            filters.append(
-                lambda fix: filter_filename.lower() in fix["fixture"].lower()
-            )
-        if filter_manufacturer:
-            filters.append(
-                lambda fix: filter_manufacturer.lower() in fix["manufacturer"].lower()
-            )
-
-        if filter_uploader != "all":
-            filters.append(lambda fix: fix["uploader"] == filter_uploader)
+        filter_filename = self.query_one("#filter_filename").value.lower()
+        filter_manufacturer = self.query_one("#filter_manufacturer").value.lower()
 
-        filtered_data = [
-            fix for fix in self.app.gdtf_data if all(f(fix) for f in filters)
-        ]
-
-        listing.mount(
-            Static(
-                f"[bold]GDTF Share Files:[/bold]{f' Showing 50 of {len(filtered_data)}:' if filtered_data else ''}"
-            )
+        self._filtered = self.app.search_gdtf_data(
+            filter_filename,
+            filter_manufacturer,
+            None if filter_uploader == "all" else filter_uploader,
         )
 
-        for fixture in filtered_data[0:50]:
-            listing.mount(GDTFFile(fixture))
-
-    def get_fixture(self, rid):
-        for fixture in self.app.gdtf_data:
-            if str(fixture.get("rid")) == str(rid):
-                return fixture
-        return {}
+        with self.app.batch_update():
+            self.query_one("#share_header", Static).update(
+                f"[bold]GDTF Share Files:[/bold]{f' {len(self._filtered)} found:' if self._filtered else ''}"
+            )
+            self.query_one("#listing_share").scroll_home(animate=False)
+            self._show_share_window(0)
 
-    def refresh_local_listing(self):
+    def _on_share_scroll(self, scroll_y):
+        """Move the mounted window of rows when the viewport nears its edges."""
+        listing = self.query_one("#listing_share")
+        row_height = self.SHARE_ROW_HEIGHT
+        visible_first = max(0, int(scroll_y) - 1) // row_height  # 1 header line
+        visible_count = listing.scrollable_content_region.height // row_height + 2
+        first = self._share_first
+        if first <= visible_first and (
+            visible_first + visible_count <= first + self.SHARE_LISTING_SIZE
+            or first + self.SHARE_LISTING_SIZE >= len(self._filtered)
+        ):
+            return
+        margin = max(0, self.SHARE_LISTING_SIZE - visible_count) // 2
+        # a fast scroll moves the viewport several times per frame, only the
+        # last requested window is applied, once, after the next refresh
+        if self._share_pending is None:
+            self.call_after_refresh(self._show_pending_share_window)
+        self._share_pending = visible_first - margin
+
+    def _show_pending_share_window(self):
+        first, self._share_pending = self._share_pending, None
+        if first is not None:
+            self._show_share_window(first)
+
+    def _show_share_window(self, first):
+        self._share_pending = None
+        total = len(self._filtered)
+        first = max(0, min(first, total - self.SHARE_LISTING_SIZE))
+        self._share_first = first
+        shown = self._filtered[first : first + self.SHARE_LISTING_SIZE]
+        row_height = self.SHARE_ROW_HEIGHT
+        with self.app.batch_update():
+            self.query_one("#share_above").styles.height = first * row_height
+            self.query_one("#share_below").styles.height = (
+                total - first - len(shown)
+            ) * row_height
+            for row, fixture in zip_longest(self._share_rows, shown):
+                if fixture is None:
+                    row.display = False
+                else:
+                    row.set_fixture(fixture, self._share_label(fixture))
+                    row.display = True
+
+    def _share_label(self, fixture):
+        rid = fixture.get("rid")
+        label = self._share_labels.get(rid)
+        if label is None:
+            label = self._share_labels[rid] = share_label(fixture)
+        return label
+
+    def refresh_local_listing(self, reload=False):
+        """Sync the downloaded files listing with the gdtf_files directory.
+
+        Only files added or removed since the last call are (un)mounted, and
+        nothing is done if the directory has not changed. Use reload when the
+        share data changed, as the labels come from it.
+        """
         listing = self.query_one("#listing_local")
-        listing.remove_children()
-        path = Path("gdtf_files")
-        gdtf_files_list = [p for p in path.iterdir() if p.suffix == ".gdtf"]
-
-        listing.mount(Static("[bold]Downloaded Files:[/bold]"))
-        for fixture in gdtf_files_list:
-            stem = Path(fixture).stem
-            sections = stem.split("@")
-            rid = sections[-1]
-            share_fixture = self.get_fixture(rid)
-            listing.mount(LocalFile(fixture, share_fixture))
-
-    def callback(self, function, result):
-        function(result)
+        mtime = os.stat("gdtf_files").st_mtime_ns
+        if not reload and mtime == self._local_mtime:
+            return
+        self._local_mtime = mtime
+        with os.scandir("gdtf_files") as entries:
+            gdtf_files = {
+                entry.path: entry.name[:-5]
+                for entry in entries
+                if entry.name.endswith(".gdtf")
+            }
+
+        if reload:
+            listing.remove_children()
+            self._local_files = {}
+            listing.mount(Static("[bold]Downloaded Files:[/bold]"))
+        for path in self._local_files.keys() - gdtf_files.keys():
+            self._local_files.pop(path).remove()
+        added = []
+        for path, stem in gdtf_files.items():
+            if path not in self._local_files:
+                sections = stem.split("@")
+                rid = sections[-1]
+                share_fixture = self.app.get_gdtf_fixture(rid)
+                added.append(LocalFile(path, share_fixture))
+                self._local_files[path] = added[-1]
+        if added:
+            listing.mount_all(added)
 
     def updated(self, result):
         if result.status:
@@ -258,15 +335,7 @@ class GDTFScreen(ModalScreen):
             self.notify(f"Failed, status: {result.result.status_code}", timeout=1)
 
     def reload_share_data(self):
-        if self.data_file.exists():
-            with open(self.data_file, "r") as f:
-                self.app.gdtf_data = json.load(f)
-        if self.query_one("#filter_manufacturer").value == "":
-            self.refresh_share_listing()
-        else:
-            self.query_one("#filter_filename").value = self.query_one(
-                "#filter_manufacturer"
-            ).value = ""  # this will cause data refresh
+        self.load_share_data(reload=True)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "do_update":
@@ -281,7 +350,6 @@ class GDTFScreen(ModalScreen):
             update_data(
                 self.app.configuration.gdtf_username,
                 self.app.configuration.gdtf_password,
-                self.callback,
                 self.updated,
                 self.data_file,
             )
@@ -293,20 +361,10 @@ class GDTFScreen(ModalScreen):
     async def run_discovery(self) -> str:
         pass
 
-    def action_focus_next(self) -> None:
-        self.focus_next()
-
-    def action_focus_previous(self) -> None:
-        self.focus_previous()
-
-    async def on_key(self, event: events.Key) -> None:
-        if event.key == "escape":
-            self.dismiss()  # Close the modal
-
     def on_file_downloaded(self, message: FileDownloaded) -> None:
         self.refresh_local_listing()
-        self.app.gdtf_mapping.update_items()
+        if self.app.gdtf_mapping is not None:
+            self.app.gdtf_mapping.update_items()
 
     def on_share_updated(self, message: ShareUpdated) -> None:
         self.reload_share_data()
-        self.refresh_local_listing()
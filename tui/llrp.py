@@ -16,7 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import random
-import select
+import selectors
 import socket
 import struct
 import time
@@ -57,29 +57,77 @@ def _rdm_checksum(data: bytes) -> int:
     return sum(data) & 0xFFFF
 
 
-def _build_probe_request(manager_cid: uuid.UUID, transaction: int) -> bytes:
-    lower_uid = b"\x00" * 6
-    upper_uid = b"\xff" * 6
-    llrp_filter = 0x0000
+_PREAMBLE = struct.pack(">HH12s", 0x0010, 0x0000, ACN_PACKET_IDENTIFIER)
 
-    probe_len = 3 + 1 + 6 + 6 + 2
-    llrp_len = 3 + 4 + 16 + 4 + probe_len
-    root_len = 3 + 4 + 16 + llrp_len
 
-    preamble = struct.pack(">HH12s", 0x0010, 0x0000, ACN_PACKET_IDENTIFIER)
-    root_pdu = _flags_length(root_len) + struct.pack(
-        ">I16s", VECTOR_ROOT_LLRP, manager_cid.bytes
-    )
-    llrp_pdu = _flags_length(llrp_len) + struct.pack(
-        ">I16sI",
-        VECTOR_LLRP_PROBE_REQUEST,
-        uuid.UUID(LLRP_BROADCAST_CID).bytes,
-        transaction,
-    )
-    probe_pdu = _flags_length(probe_len) + struct.pack(
-        ">B6s6sH", VECTOR_PROBE_REQUEST_DATA, lower_uid, upper_uid, llrp_filter
+def _llrp_template(llrp_vector: int, destination_cid: bytes, payload: bytes):
+    """Preamble, root and LLRP PDUs around payload, with the manager CID and
+    transaction number left zeroed for pack_into."""
+    llrp_len = 3 + 4 + 16 + 4 + len(payload)
+    root_len = 3 + 4 + 16 + llrp_len
+    return bytearray(
+        _PREAMBLE
+        + _flags_length(root_len)
+        + struct.pack(">I16s", VECTOR_ROOT_LLRP, b"")
+        + _flags_length(llrp_len)
+        + struct.pack(">I16sI", llrp_vector, destination_cid, 0)
+        + payload
     )
-    return preamble + root_pdu + llrp_pdu + probe_pdu
+
+
+# offsets into both templates
+_MANAGER_CID_OFFSET = 16 + 3 + 4
+_DESTINATION_CID_OFFSET = _MANAGER_CID_OFFSET + 16 + 3 + 4
+_TRANSACTION_OFFSET = _DESTINATION_CID_OFFSET + 16
+
+# probe for the full UID range, no filter
+_PROBE_TEMPLATE = _llrp_template(
+    VECTOR_LLRP_PROBE_REQUEST,
+    uuid.UUID(LLRP_BROADCAST_CID).bytes,
+    _flags_length(3 + 1 + 6 + 6 + 2)
+    + struct.pack(
+        ">B6s6sH", VECTOR_PROBE_REQUEST_DATA, b"\x00" * 6, b"\xff" * 6, 0x0000
+    ),
+)
+
+# GET DEVICE_LABEL, the RDM start code is carried by the RDM PDU vector
+_RDM_MESSAGE_LENGTH = 24
+_RDM_GET_LABEL_TEMPLATE = _llrp_template(
+    VECTOR_LLRP_RDM_CMD,
+    b"",
+    _flags_length(3 + 1 + _RDM_MESSAGE_LENGTH - 1 + 2)
+    + struct.pack(
+        ">BBB6s6sBBBHBHBH",
+        VECTOR_RDM_CMD_RDM_DATA,
+        RDM_SUB_START_CODE,
+        _RDM_MESSAGE_LENGTH,
+        b"",  # destination UID
+        b"",  # source UID
+        0,  # transaction number
+        1,  # port ID
+        0,  # message count
+        0,  # sub-device
+        E120_GET_COMMAND,
+        E120_DEVICE_LABEL,
+        0,  # parameter data length
+        0,  # checksum
+    ),
+)
+_RDM_MESSAGE_OFFSET = _TRANSACTION_OFFSET + 4 + 3 + 1  # after the start code
+_RDM_UIDS_OFFSET = _RDM_MESSAGE_OFFSET + 2
+_RDM_TRANSACTION_OFFSET = _RDM_UIDS_OFFSET + 12
+_RDM_CHECKSUM_OFFSET = _RDM_MESSAGE_OFFSET + _RDM_MESSAGE_LENGTH - 1
+# checksum of the fixed fields, the UIDs and transaction number are added per packet
+_RDM_GET_LABEL_CHECKSUM = RDM_START_CODE + _rdm_checksum(
+    _RDM_GET_LABEL_TEMPLATE[_RDM_MESSAGE_OFFSET:_RDM_CHECKSUM_OFFSET]
+)
+
+
+def _build_probe_request(manager_cid: uuid.UUID, transaction: int) -> bytes:
+    packet = _PROBE_TEMPLATE.copy()
+    struct.pack_into(">16s", packet, _MANAGER_CID_OFFSET, manager_cid.bytes)
+    struct.pack_into(">I", packet, _TRANSACTION_OFFSET, transaction)
+    return bytes(packet)
 
 
 def _build_rdm_get_label(
@@ -90,37 +138,25 @@ def _build_rdm_get_label(
     transaction: int,
     rdm_transaction: int,
 ) -> bytes:
-    message_length = 24
-    rdm_message = bytearray([RDM_START_CODE, RDM_SUB_START_CODE, message_length])
-    rdm_message.extend(target_uid)
-    rdm_message.extend(manager_uid)
-    rdm_message.extend([rdm_transaction & 0xFF, 1, 0])
-    rdm_message.extend(b"\x00\x00")
-    rdm_message.append(E120_GET_COMMAND)
-    rdm_message.extend(struct.pack(">H", E120_DEVICE_LABEL))
-    rdm_message.append(0x00)
-
-    checksum = _rdm_checksum(rdm_message)
-    rdm_message_no_sc = rdm_message[1:]
-    rdm_message_no_sc.extend(struct.pack(">H", checksum))
-
-    rdm_pdu_len = 3 + 1 + len(rdm_message_no_sc)
-    llrp_len = 3 + 4 + 16 + 4 + rdm_pdu_len
-    root_len = 3 + 4 + 16 + llrp_len
-
-    preamble = struct.pack(">HH12s", 0x0010, 0x0000, ACN_PACKET_IDENTIFIER)
-    root_pdu = _flags_length(root_len) + struct.pack(
-        ">I16s", VECTOR_ROOT_LLRP, manager_cid.bytes
-    )
-    llrp_pdu = _flags_length(llrp_len) + struct.pack(
-        ">I16sI", VECTOR_LLRP_RDM_CMD, target_cid, transaction
+    packet = _RDM_GET_LABEL_TEMPLATE.copy()
+    struct.pack_into(">16s", packet, _MANAGER_CID_OFFSET, manager_cid.bytes)
+    struct.pack_into(">16sI", packet, _DESTINATION_CID_OFFSET, target_cid, transaction)
+    struct.pack_into(">6s6s", packet, _RDM_UIDS_OFFSET, target_uid, manager_uid)
+    rdm_transaction &= 0xFF
+    packet[_RDM_TRANSACTION_OFFSET] = rdm_transaction
+
+    checksum = (
+        _RDM_GET_LABEL_CHECKSUM
+        + _rdm_checksum(target_uid)
+        + _rdm_checksum(manager_uid)
+        + rdm_transaction
     )
-    rdm_pdu = (
-        _flags_length(rdm_pdu_len)
-        + struct.pack(">B", VECTOR_RDM_CMD_RDM_DATA)
-        + rdm_message_no_sc
-    )
-    return preamble + root_pdu + llrp_pdu + rdm_pdu
+    struct.pack_into(">H", packet, _RDM_CHECKSUM_OFFSET, checksum & 0xFFFF)
+    return bytes(packet)
+
+
+_U32 = struct.Struct(">I")
+_U16 = struct.Struct(">H")
 
 
 def _parse_probe_reply(data: bytes):
@@ -128,13 +164,13 @@ def _parse_probe_reply(data: bytes):
         return None
 
     offset = 16
-    root_vector = struct.unpack(">I", data[offset + 3 : offset + 7])[0]
+    root_vector = _U32.unpack_from(data, offset + 3)[0]
     if root_vector != VECTOR_ROOT_LLRP:
         return None
-    sender_cid = data[offset + 7 : offset + 23]
+    sender_cid = bytes(data[offset + 7 : offset + 23])
 
     offset += 23
-    llrp_vector = struct.unpack(">I", data[offset + 3 : offset + 7])[0]
+    llrp_vector = _U32.unpack_from(data, offset + 3)[0]
     if llrp_vector != VECTOR_LLRP_PROBE_REPLY:
         return None
 
@@ -142,7 +178,7 @@ def _parse_probe_reply(data: bytes):
     if data[offset + 3] != VECTOR_PROBE_REPLY_DATA:
         return None
 
-    uid = data[offset + 4 : offset + 10]
+    uid = bytes(data[offset + 4 : offset + 10])
     hw = data[offset + 10 : offset + 16]
     comp_type = data[offset + 16]
     return sender_cid, uid, hw, comp_type
@@ -153,7 +189,7 @@ def _parse_rdm_label_response(data: bytes):
         return None
 
     offset = 16 + 23
-    llrp_vector = struct.unpack(">I", data[offset + 3 : offset + 7])[0]
+    llrp_vector = _U32.unpack_from(data, offset + 3)[0]
     if llrp_vector != VECTOR_LLRP_RDM_CMD:
         return None
 
@@ -166,12 +202,12 @@ def _parse_rdm_label_response(data: bytes):
         return None
 
     command_class = rdm[20]
-    pid = struct.unpack(">H", rdm[21:23])[0]
+    pid = _U16.unpack_from(rdm, 21)[0]
     pdl = rdm[23]
     if command_class != E120_GET_COMMAND_RESPONSE or pid != E120_DEVICE_LABEL:
         return None
 
-    label = rdm[24 : 24 + pdl].decode("ascii", errors="ignore").strip("\x00")
+    label = str(rdm[24 : 24 + pdl], "ascii", errors="ignore").strip("\x00")
     return label
 
 
@@ -184,6 +220,9 @@ class LlrpDiscovery:
             ">I", device_id
         )
         self.rx_socket = None
+        # replies are received into one reused buffer, parsers get a view of it
+        self._rx_buf = bytearray(2048)
+        self._rx_view = memoryview(self._rx_buf)
         self.tx_socket = None
 
     def start(self):
@@ -214,64 +253,71 @@ class LlrpDiscovery:
 
     def discover_devices(self, timeout: float = 1.5):
         devices = {}
+        pending_labels = set()
         transaction = int(time.time()) & 0xFFFFFFFF
         probe = _build_probe_request(self.manager_cid, transaction=transaction)
         self.tx_socket.sendto(probe, (LLRP_REQUEST_GRP, LLRP_PORT))
 
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            remaining = deadline - time.time()
-            r, _, _ = select.select([self.rx_socket], [], [], min(0.1, remaining))
-            if not r:
-                continue
-            data, addr = self.rx_socket.recvfrom(1500)
-            parsed = _parse_probe_reply(data)
-            if not parsed:
-                continue
-            sender_cid, uid, _hw, comp_type = parsed
-            ip = addr[0]
-            if ip in devices:
-                continue
-            devices[ip] = {
-                "source_ip": ip,
-                "short_name": "",
-                "long_name": "",
-                "uid": ":".join(f"{b:02x}" for b in uid),
-                "component_type": comp_type,
-                "target_cid": sender_cid,
-                "target_uid": uid,
-            }
-
-        if not devices:
-            return []
-
-        for index, device in enumerate(devices.values()):
-            rdm_packet = _build_rdm_get_label(
-                manager_cid=self.manager_cid,
-                target_cid=device["target_cid"],
-                manager_uid=self.manager_uid,
-                target_uid=device["target_uid"],
-                transaction=(transaction + index + 1) & 0xFFFFFFFF,
-                rdm_transaction=index + 1,
-            )
-            self.tx_socket.sendto(rdm_packet, (LLRP_REQUEST_GRP, LLRP_PORT))
-
-        label_deadline = time.time() + timeout
-        while time.time() < label_deadline:
-            remaining = label_deadline - time.time()
-            r, _, _ = select.select([self.rx_socket], [], [], min(0.1, remaining))
-            if not r:
-                continue
-            data, addr = self.rx_socket.recvfrom(1500)
-            label = _parse_rdm_label_response(data)
-            if not label:
-                continue
-            ip = addr[0]
-            if ip in devices:
-                devices[ip]["short_name"] = label
+        # targets back off randomly before replying, so probe replies are
+        # accepted for the whole timeout. Labels are requested as soon as a
+        # target shows up, and only still missing ones are waited for after.
+        probe_deadline = time.monotonic() + timeout
+        label_deadline = probe_deadline + timeout
+
+        self.rx_socket.setblocking(False)
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.rx_socket, selectors.EVENT_READ)
+            while True:
+                now = time.monotonic()
+                if now >= probe_deadline and (
+                    not pending_labels or now >= label_deadline
+                ):
+                    break
+                deadline = probe_deadline if now < probe_deadline else label_deadline
+                if not selector.select(deadline - now):
+                    continue
+                while True:
+                    try:
+                        nbytes, addr = self.rx_socket.recvfrom_into(self._rx_buf)
+                    except BlockingIOError:
+                        break
+                    data = self._rx_view[:nbytes]
+                    ip = addr[0]
+                    parsed = _parse_probe_reply(data)
+                    if parsed:
+                        if ip not in devices:
+                            self._request_label(devices, ip, parsed, transaction)
+                            pending_labels.add(ip)
+                        continue
+                    label = _parse_rdm_label_response(data)
+                    if label and ip in devices:
+                        devices[ip]["short_name"] = label
+                        pending_labels.discard(ip)
 
         for device in devices.values():
             device.pop("target_cid", None)
             device.pop("target_uid", None)
 
         return list(devices.values())
+
+    def _request_label(self, devices: dict, ip: str, probe_reply, transaction: int):
+        sender_cid, uid, _hw, comp_type = probe_reply
+        index = len(devices)
+        devices[ip] = {
+            "source_ip": ip,
+            "short_name": "",
+            "long_name": "",
+            "uid": ":".join(f"{b:02x}" for b in uid),
+            "component_type": comp_type,
+            "target_cid": sender_cid,
+            "target_uid": uid,
+        }
+        rdm_packet = _build_rdm_get_label(
+            manager_cid=self.manager_cid,
+            target_cid=sender_cid,
+            manager_uid=self.manager_uid,
+            target_uid=uid,
+            transaction=(transaction + index + 1) & 0xFFFFFFFF,
+            rdm_transaction=index + 1,
+        )
+        self.tx_socket.sendto(rdm_packet, (LLRP_REQUEST_GRP, LLRP_PORT))
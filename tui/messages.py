@@ -19,33 +19,18 @@ from textual.message import Message
 from dataclasses import dataclass
 
 
-class MvrParsed(Message):
-    """Message sent when monitors are fetched from the API."""
-
-    def __init__(self, fixtures: list | None = None, tags: list | None = None) -> None:
-        self.fixtures = fixtures
-        self.tags = tags
-        super().__init__()
-
-
-class Errors(Message):
-    """Message sent when monitors are fetched from the API."""
-
-    def __init__(self, error: str | None = None) -> None:
-        self.error = error
-        super().__init__()
-
-
 class NetworkDevicesDiscovered(Message):
     """Message sent when monitors are fetched from the API."""
 
+    __slots__ = ("devices", "error")
+
     def __init__(self, devices: list | None = None, error: str = "") -> None:
         self.devices = devices
         self.error = error
         super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class RdmDevicesDiscovered(Message):
     """Message with discovered devices."""
 
@@ -53,7 +38,7 @@ class RdmDevicesDiscovered(Message):
     error: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class RdmDeviceDetailDiscovered(Message):
     """Message with discovered device details."""
 
@@ -61,7 +46,7 @@ class RdmDeviceDetailDiscovered(Message):
     error: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class RdmDiscoveryMessage(Message):
     """Message to signal RDM discovery is complete."""
 
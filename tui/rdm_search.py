@@ -20,6 +20,9 @@ import time
 import struct
 import random
 
+# print the RDM traffic and the decoded responses, costly during discovery
+VERBOSE = False
+
 # Robe Universal Interface API constants
 HEADER = 0xA5
 PACKET_TYPE_RDM_RESPONSE = 0x11
@@ -57,9 +60,51 @@ SOFTWARE_VERSION_LABEL = 0x00C0
 DMX_START_ADDRESS = 0x00F0
 
 RDM_PARAMETER_NAMES = {
-    v: k for k, v in globals().items() if k.isupper() and isinstance(v, int)
+    DISC_UNIQUE_BRANCH: "DISC_UNIQUE_BRANCH",
+    DISC_MUTE: "DISC_MUTE",
+    DISC_UN_MUTE: "DISC_UN_MUTE",
+    SUPPORTED_PARAMETERS: "SUPPORTED_PARAMETERS",
+    DEVICE_INFO: "DEVICE_INFO",
+    DEVICE_MODEL_DESCRIPTION: "DEVICE_MODEL_DESCRIPTION",
+    MANUFACTURER_LABEL: "MANUFACTURER_LABEL",
+    DEVICE_LABEL: "DEVICE_LABEL",
+    SOFTWARE_VERSION_LABEL: "SOFTWARE_VERSION_LABEL",
+    DMX_START_ADDRESS: "DMX_START_ADDRESS",
+}
+# keys of the device data returned by get_device_parameters
+_DEVICE_DATA_KEYS = {pid: name.lower() for pid, name in RDM_PARAMETER_NAMES.items()}
+# verbose lines of parse_supported_parameters
+_SUPPORTED_PARAMETER_LINES = {
+    pid: f"        - 0x{pid:04x} ({name})" for pid, name in RDM_PARAMETER_NAMES.items()
 }
 
+RDM_COMMAND_CLASS_NAMES = {
+    DISCOVERY_COMMAND: "DISCOVERY_COMMAND",
+    DISCOVERY_COMMAND_RESPONSE: "DISCOVERY_COMMAND_RESPONSE",
+    GET_COMMAND: "GET_COMMAND",
+    GET_COMMAND_RESPONSE: "GET_COMMAND_RESPONSE",
+    SET_COMMAND: "SET_COMMAND",
+    SET_COMMAND_RESPONSE: "SET_COMMAND_RESPONSE",
+}
+
+# Robe packet: header, packet type, data length (LE), header CRC, data, CRC
+ROBE_HEADER_SIZE = 5
+_ROBE_HEADER = struct.Struct("<BBHB")
+_DATA_LENGTH = struct.Struct("<H")
+# RDM fields are big endian
+_U16 = struct.Struct(">H")
+# sub start code to PDL, followed by the parameter data and the checksum,
+# the Robe interface sends the start code itself
+_RDM_FIXED = struct.Struct(">BB6s6sBBBHBHB")
+# the same without parameter data, checksum included
+_RDM_NO_PD = struct.Struct(">BB6s6sBBBHBHBH")
+# only the fields of a response that are acted upon: response type, command
+# class, PID and PDL
+_RDM_RESPONSE = struct.Struct(">15xB3xBHB")
+_DEVICE_INFO = struct.Struct(">HHHIHHHHB")
+# the old fixed wait for a response, now only the upper bound
+RESPONSE_TIMEOUT = 0.2
+
 RDM_RESPONSE_TYPE_NAMES = {
     0x00: "RESPONSE_TYPE_ACK",
     0x01: "RESPONSE_TYPE_ACK_TIMER",
@@ -81,23 +126,22 @@ def build_robe_packet(packet_type: int, rdm_packet: bytes) -> bytes:
         PACKET_TYPE_RDM_PACKET_OUT,
         PACKET_TYPE_RDM_DISCOVERY_UNIQUE_BRANCH,
     ]:
-        data_to_wrap += bytes(random.getrandbits(8) for _ in range(4))
+        data_to_wrap += random.randbytes(4)
 
     data_len = len(data_to_wrap)
-    header_part = bytearray(
-        [HEADER, packet_type, data_len & 0xFF, (data_len >> 8) & 0xFF]
+    header_crc = calculate_byte_sum_crc(
+        (HEADER, packet_type, data_len & 0xFF, data_len >> 8)
     )
-    header_crc = calculate_byte_sum_crc(header_part)
 
-    packet = bytearray()
-    packet.extend(header_part)
-    packet.append(header_crc)
-    packet.extend(data_to_wrap)
-
-    all_crc = calculate_byte_sum_crc(packet)
-    packet.append(all_crc)
+    # the final CRC covers the header, the header CRC and the data, the
+    # header bytes add up to header_crc already
+    all_crc = (2 * header_crc + sum(data_to_wrap)) & 0xFF
 
-    return bytes(packet)
+    return (
+        _ROBE_HEADER.pack(HEADER, packet_type, data_len, header_crc)
+        + data_to_wrap
+        + all_crc.to_bytes()
+    )
 
 
 def calculate_rdm_checksum(data: bytes) -> int:
@@ -105,39 +149,63 @@ def calculate_rdm_checksum(data: bytes) -> int:
     return sum(data)
 
 
+# checksum of the fixed fields of a packet without parameter data, the
+# destination UID, transaction number, command class and PID are added per packet
+_RDM_NO_PD_CHECKSUM = (
+    RDM_START_CODE + RDM_SUB_START_CODE + 24 + sum(CONTROLLER_UID) + 1  # Port ID
+)
+
+
+def _build_rdm_packet_no_pd(dest_uid: bytes, tn: int, cc: int, pid: int) -> bytes:
+    """build_rdm_packet for the common case of a request without parameter data."""
+    checksum = _RDM_NO_PD_CHECKSUM + sum(dest_uid) + tn + cc + (pid >> 8) + (pid & 0xFF)
+    return _RDM_NO_PD.pack(
+        RDM_SUB_START_CODE,
+        24,  # Message length without checksum
+        dest_uid,
+        CONTROLLER_UID,
+        tn,
+        1,  # Port ID
+        0,  # Message Count
+        0,  # Sub-device
+        cc,
+        pid,
+        0,  # PDL
+        checksum,
+    )
+
+
 def build_rdm_packet(
     dest_uid: bytes, tn: int, cc: int, pid: int, pd: bytes = b""
 ) -> bytes:
     """Builds an RDM packet (the part that goes into the Robe packet)."""
+    if not pd:
+        return _build_rdm_packet_no_pd(dest_uid, tn, cc, pid)
     pdl = len(pd)
-    message_length = 24 + pdl  # Standard length without checksum
-
-    packet_for_checksum = bytearray(
-        [RDM_START_CODE, RDM_SUB_START_CODE, message_length]
+    header = _RDM_FIXED.pack(
+        RDM_SUB_START_CODE,
+        24 + pdl,  # Message length without checksum
+        dest_uid,
+        CONTROLLER_UID,
+        tn,
+        1,  # Port ID
+        0,  # Message Count
+        0,  # Sub-device
+        cc,
+        pid,
+        pdl,
     )
-    packet_for_checksum.extend(dest_uid)
-    packet_for_checksum.extend(CONTROLLER_UID)
-    packet_for_checksum.extend([tn, 1, 0])  # TN, Port ID, Message Count
-    packet_for_checksum.extend(b"\x00\x00")  # Sub-device
-    packet_for_checksum.append(cc)
-    packet_for_checksum.extend(struct.pack(">H", pid))
-    packet_for_checksum.append(pdl)
-    packet_for_checksum.extend(pd)
-
-    checksum = calculate_rdm_checksum(packet_for_checksum)
-
-    # Final RDM message (without Start Code) to be wrapped in a Robe packet
-    rdm_message = packet_for_checksum[1:]
-    rdm_message.extend(struct.pack(">H", checksum))
-
-    return bytes(rdm_message)
+    # the checksum includes the start code
+    checksum = RDM_START_CODE + calculate_rdm_checksum(header) + sum(pd)
+    return header + pd + _U16.pack(checksum)
 
 
 def parse_text_response(pd: bytes):
     """Parses a simple null-terminated string response."""
     try:
         text = pd.decode("utf-8", errors="ignore").strip()
-        print(f"    └─ Text: {text}")
+        if VERBOSE:
+            print(f"    └─ Text: {text}")
         return text
     except Exception as e:
         print(f"    └─ Error decoding text: {e}")
@@ -147,10 +215,16 @@ def parse_text_response(pd: bytes):
 def parse_supported_parameters(pd: bytes):
     """Parses a list of supported PIDs."""
     pids = struct.unpack(f">{len(pd) // 2}H", pd)
-    print("    └─ Supported PIDs:")
-    for pid in pids:
-        name = RDM_PARAMETER_NAMES.get(pid, "Unknown")
-        print(f"        - 0x{pid:04x} ({name})")
+    if VERBOSE:
+        print("    └─ Supported PIDs:")
+        if pids:
+            print(
+                "\n".join(
+                    _SUPPORTED_PARAMETER_LINES.get(pid)
+                    or f"        - 0x{pid:04x} (Unknown)"
+                    for pid in pids
+                )
+            )
     return list(pids)
 
 
@@ -166,21 +240,22 @@ def parse_device_info(pd: bytes):
         dmx_address,
         sub_device_count,
         sensor_count,
-    ) = struct.unpack(">HHHIHHHHB", pd)
+    ) = _DEVICE_INFO.unpack(pd)
     current_personality = personality >> 8
     total_personalities = personality & 0xFF
-    print("    └─ Device Info:")
-    print(f"        - RDM Version: {rdm_version >> 8}.{rdm_version & 0xFF}")
-    print(f"        - Device Model ID: 0x{model_id:04x}")
-    print(f"        - Product Category: 0x{category:04x}")
-    print(f"        - Software Version ID: 0x{sw_version:08x}")
-    print(f"        - DMX512 Footprint: {footprint}")
-    print(
-        f"        - DMX512 Personality: {current_personality} of {total_personalities}"
-    )
-    print(f"        - DMX Start Address: {dmx_address}")
-    print(f"        - Sub-device Count: {sub_device_count}")
-    print(f"        - Sensor Count: {sensor_count}")
+    if VERBOSE:
+        print("    └─ Device Info:")
+        print(f"        - RDM Version: {rdm_version >> 8}.{rdm_version & 0xFF}")
+        print(f"        - Device Model ID: 0x{model_id:04x}")
+        print(f"        - Product Category: 0x{category:04x}")
+        print(f"        - Software Version ID: 0x{sw_version:08x}")
+        print(f"        - DMX512 Footprint: {footprint}")
+        print(
+            f"        - DMX512 Personality: {current_personality} of {total_personalities}"
+        )
+        print(f"        - DMX Start Address: {dmx_address}")
+        print(f"        - Sub-device Count: {sub_device_count}")
+        print(f"        - Sensor Count: {sensor_count}")
     return {
         "rdm_protocol_version": f"{rdm_version >> 8}.{rdm_version & 0xFF}",
         "device_model_id": model_id,
@@ -199,67 +274,70 @@ def parse_device_info(pd: bytes):
 
 def parse_dmx_start_address(pd: bytes):
     """Parses the DMX_START_ADDRESS response."""
-    address = struct.unpack(">H", pd)[0]
-    print(f"    └─ DMX Start Address: {address}")
+    address = _U16.unpack(pd)[0]
+    if VERBOSE:
+        print(f"    └─ DMX Start Address: {address}")
     return address
 
 
 def parse_ack(pd: bytes, pid: int, cc: int):
     """Parses a generic ACK response."""
     if not pd:
-        print("    └─ Acknowledged (no data).")
+        if VERBOSE:
+            print("    └─ Acknowledged (no data).")
         return True
     # For MUTE/UNMUTE, the PD is a 2-byte control field
     elif pid in [DISC_MUTE, DISC_UN_MUTE]:
-        control_field = struct.unpack(">H", pd)[0]
-        print(f"    └─ Acknowledged. Control Field: 0x{control_field:04x}")
+        control_field = _U16.unpack(pd)[0]
+        if VERBOSE:
+            print(f"    └─ Acknowledged. Control Field: 0x{control_field:04x}")
         return control_field
     else:
-        print(f"    └─ Acknowledged with data: {pd.hex(' ')}")
+        if VERBOSE:
+            print(f"    └─ Acknowledged with data: {pd.hex(' ')}")
         return pd
 
 
 def parse_discovery_response(rdm_data: bytes):
     """Parses a DISC_UNIQUE_BRANCH response and returns the decoded UID."""
-    print("  └─ Parsing Discovery response...")
+    if VERBOSE:
+        print("  └─ Parsing Discovery response...")
     try:
         # Find the preamble separator
         separator_index = rdm_data.find(b"\xaa")
         if separator_index == -1:
-            print("    └─ Discovery response separator (0xAA) not found.")
+            if VERBOSE:
+                print("    └─ Discovery response separator (0xAA) not found.")
             return None
 
         # The EUID and ECS follow the separator
-        euid_ecs_data = rdm_data[separator_index + 1 :]
-        if len(euid_ecs_data) < 16:
-            print(
-                f"    └─ Insufficient data for EUID and Checksum (found {len(euid_ecs_data)} bytes)."
-            )
+        start = separator_index + 1
+        if len(rdm_data) - start < 16:
+            if VERBOSE:
+                print(
+                    f"    └─ Insufficient data for EUID and Checksum (found {len(rdm_data) - start} bytes)."
+                )
             return None
 
-        euid = euid_ecs_data[:12]
-        ecs = euid_ecs_data[12:16]
-
-        # Decode UID
-        uid = bytearray()
-        for i in range(6):
-            uid.append(euid[i * 2] & euid[i * 2 + 1])
-        uid = bytes(uid)
-        print(f"    ├─ Discovered UID: {uid.hex(':')}")
-
-        # Verify checksum
-        calculated_checksum = sum(euid)
-
-        cs_msb = ecs[0] & ecs[1]
-        cs_lsb = ecs[2] & ecs[3]
-        received_checksum = (cs_msb << 8) | cs_lsb
-
-        if calculated_checksum == received_checksum:
-            print(f"    └─ Checksum OK (0x{received_checksum:04x})")
-        else:
-            print(
-                f"    └─ Checksum mismatch! Calculated: 0x{calculated_checksum:04x}, Received: 0x{received_checksum:04x}"
-            )
+        euid = rdm_data[start : start + 12]
+
+        # Decode UID, each byte is sent twice, OR-ed with 0xAA and 0x55, so
+        # AND-ing the even and the odd bytes as two integers gives the UID
+        uid = (int.from_bytes(euid[0::2]) & int.from_bytes(euid[1::2])).to_bytes(6)
+        if VERBOSE:
+            print(f"    ├─ Discovered UID: {uid.hex(':')}")
+
+        # The checksum is only reported, skip it when nobody is looking
+        if VERBOSE:
+            ecs = rdm_data[start + 12 : start + 16]
+            calculated_checksum = sum(euid)
+            received_checksum = (ecs[0] & ecs[1]) << 8 | (ecs[2] & ecs[3])
+            if calculated_checksum == received_checksum:
+                print(f"    └─ Checksum OK (0x{received_checksum:04x})")
+            else:
+                print(
+                    f"    └─ Checksum mismatch! Calculated: 0x{calculated_checksum:04x}, Received: 0x{received_checksum:04x}"
+                )
 
         return uid
 
@@ -268,57 +346,52 @@ def parse_discovery_response(rdm_data: bytes):
         return None
 
 
+# parsers of the ACK parameter data, parse_ack handles anything else
+_ACK_PARSERS = {
+    DEVICE_INFO: parse_device_info,
+    SUPPORTED_PARAMETERS: parse_supported_parameters,
+    DEVICE_LABEL: parse_text_response,
+    SOFTWARE_VERSION_LABEL: parse_text_response,
+    MANUFACTURER_LABEL: parse_text_response,
+    DEVICE_MODEL_DESCRIPTION: parse_text_response,
+    DMX_START_ADDRESS: parse_dmx_start_address,
+}
+
+
 def parse_rdm_response(rdm_data: bytes, sent_pid: int):
     """Parses the core RDM response packet."""
     if not rdm_data:
-        print("  └─ Empty RDM data.")
+        if VERBOSE:
+            print("  └─ Empty RDM data.")
         return None, None
 
     try:
-        sub_start = rdm_data[0]
-        msg_len = rdm_data[1]
-        dest_uid = rdm_data[2:8]
-        src_uid = rdm_data[8:14]
-        tn = rdm_data[14]
-        response_type = rdm_data[15]
-        msg_count = rdm_data[16]
-        sub_device = struct.unpack(">H", rdm_data[17:19])[0]
-        cc = rdm_data[19]
-        pid = struct.unpack(">H", rdm_data[20:22])[0]
-        pdl = rdm_data[22]
-        pd = rdm_data[23 : 23 + pdl]
-        checksum = struct.unpack(">H", rdm_data[-2:])[0]
-
-        print("  ├─ RDM Response:")
-        print(f"  │  - Source UID: {src_uid.hex(':')}")
-        print(f"  │  - Transaction #: {tn}")
-        print(
-            f"  │  - Response Type: {RDM_RESPONSE_TYPE_NAMES.get(response_type, 'Unknown')}"
-        )
-        print(
-            f"  │  - Command Class: 0x{cc:02x} ({RDM_PARAMETER_NAMES.get(cc, 'Unknown')}_RESPONSE)"
-        )
-        print(f"  │  - PID: 0x{pid:04x} ({RDM_PARAMETER_NAMES.get(pid, 'Unknown')})")
-        print(f"  │  - PDL: {pdl}")
+        response_type, cc, pid, pdl = _RDM_RESPONSE.unpack_from(rdm_data)
+        pd = rdm_data[_RDM_RESPONSE.size : _RDM_RESPONSE.size + pdl]
+
+        if VERBOSE:
+            print("  ├─ RDM Response:")
+            print(f"  │  - Source UID: {rdm_data[8:14].hex(':')}")
+            print(f"  │  - Transaction #: {rdm_data[14]}")
+            print(
+                f"  │  - Response Type: {RDM_RESPONSE_TYPE_NAMES.get(response_type, 'Unknown')}"
+            )
+            print(
+                f"  │  - Command Class: 0x{cc:02x} ({RDM_COMMAND_CLASS_NAMES.get(cc, 'Unknown')})"
+            )
+            print(
+                f"  │  - PID: 0x{pid:04x} ({RDM_PARAMETER_NAMES.get(pid, 'Unknown')})"
+            )
+            print(f"  │  - PDL: {pdl}")
 
         response_data = None
         if response_type == 0x00:  # ACK
-            if pid == DEVICE_INFO:
-                response_data = parse_device_info(pd)
-            elif pid == SUPPORTED_PARAMETERS:
-                response_data = parse_supported_parameters(pd)
-            elif pid in [
-                DEVICE_LABEL,
-                SOFTWARE_VERSION_LABEL,
-                MANUFACTURER_LABEL,
-                DEVICE_MODEL_DESCRIPTION,
-            ]:
-                response_data = parse_text_response(pd)
-            elif pid == DMX_START_ADDRESS:
-                response_data = parse_dmx_start_address(pd)
+            parser = _ACK_PARSERS.get(pid)
+            if parser:
+                response_data = parser(pd)
             else:
                 response_data = parse_ack(pd, pid, cc)
-        else:
+        elif VERBOSE:
             print("    └─ Received NACK or other response type.")
 
         return pid, response_data
@@ -333,20 +406,21 @@ def parse_robe_response(response: bytes, sent_pid: int):
     Parses the outer Robe packet, dispatches RDM parsing,
     and returns a status tuple (type, data).
     """
-    print("  ├─ Parsing Robe response...")
-    if not response or response[0] != HEADER:
-        print("  └─ Invalid or empty response.")
+    if VERBOSE:
+        print("  ├─ Parsing Robe response...")
+    if len(response) < ROBE_HEADER_SIZE or response[0] != HEADER:
+        if VERBOSE:
+            print("  └─ Invalid or empty response.")
         return "error", None
 
-    packet_type = response[1]
-    data_len = struct.unpack("<H", response[2:4])[0]
-    rdm_data_with_trailer = response[5:-1]
+    _, packet_type, data_len, _ = _ROBE_HEADER.unpack_from(response)
 
-    print(f"  │  - Packet Type: 0x{packet_type:02x}")
-    print(f"  │  - Data Length: {data_len}")
+    if VERBOSE:
+        print(f"  │  - Packet Type: 0x{packet_type:02x}")
+        print(f"  │  - Data Length: {data_len}")
 
-    # The Robe API appends 4 bytes to the end of the RDM data
-    rdm_data = rdm_data_with_trailer[:-4]
+    # The Robe API appends 4 bytes to the end of the RDM data, before the CRC
+    rdm_data = response[ROBE_HEADER_SIZE:-5]
 
     if packet_type == PACKET_TYPE_RDM_RESPONSE:
         pid, rdm_response_data = parse_rdm_response(rdm_data, sent_pid)
@@ -358,7 +432,8 @@ def parse_robe_response(response: bytes, sent_pid: int):
         # Per the Robe API, a 4-byte data length for a discovery response
         # means the interface timed out waiting for a real RDM response.
         if data_len == 4:
-            print("  └─ Robe interface reported no RDM device response.")
+            if VERBOSE:
+                print("  └─ Robe interface reported no RDM device response.")
             return "no_response", None
 
         uid = parse_discovery_response(rdm_data)
@@ -368,111 +443,157 @@ def parse_robe_response(response: bytes, sent_pid: int):
             # If data was received but couldn't be parsed into a valid UID, it's a collision
             return "collision", rdm_data
     else:
-        print(f"  └─ Unhandled packet type: 0x{packet_type:02x}")
+        if VERBOSE:
+            print(f"  └─ Unhandled packet type: 0x{packet_type:02x}")
         return "unhandled", None
 
 
+def read_robe_packet(ser: serial.Serial, timeout: float = RESPONSE_TIMEOUT) -> bytes:
+    """
+    Reads one Robe packet, returning as soon as it is complete. Bytes before
+    the header are skipped, a partial packet is returned on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    packet = bytearray()
+    needed = 1
+    while len(packet) < needed:
+        chunk = ser.read(needed - len(packet))
+        if chunk:
+            packet += chunk
+        elif time.monotonic() >= deadline:
+            break
+        if needed == 1 and packet:
+            if packet[0] != HEADER:
+                packet.clear()
+                continue
+            needed = ROBE_HEADER_SIZE
+        elif needed == ROBE_HEADER_SIZE and len(packet) == needed:
+            needed += _DATA_LENGTH.unpack_from(packet, 2)[0] + 1
+    return bytes(packet)
+
+
 def send_and_receive(
     ser: serial.Serial, description: str, robe_packet: bytes, sent_pid: int = None
 ):
     """
     Sends a packet, receives, and parses the response, returning a status tuple.
     """
-    print(f"Sending: {description} ({robe_packet.hex(' ')})")
+    ser.reset_input_buffer()  # drop anything late from a previous request
     ser.write(robe_packet)
-    time.sleep(0.2)
-    response = ser.read(ser.in_waiting)
+    # the bus is strictly request/response, but the logging can be done
+    # while the interface is already busy with the request
+    if VERBOSE:
+        print(f"Sending: {description} ({robe_packet.hex(' ')})")
+    response = read_robe_packet(ser)
 
     if response:
-        print(f"Received: {response.hex(' ')}")
+        if VERBOSE:
+            print(f"Received: {response.hex(' ')}")
         status, data = parse_robe_response(response, sent_pid)
     else:
-        print("No response received.")
+        if VERBOSE:
+            print("No response received.")
         status, data = "no_response", None
 
-    print("-" * 40)
-    time.sleep(0.5)
+    if VERBOSE:
+        print("-" * 40)
     return status, data
 
 
 def binary_search_branch(ser, tn, lower_bound, upper_bound, discovered_uids):
     """
-    Recursively searches a branch of the UID tree for RDM devices.
+    Searches a branch of the UID tree for RDM devices.
     """
-    if lower_bound > upper_bound:
-        return tn
-
-    # Base case: If we are searching a single UID, try to mute it.
-    if lower_bound == upper_bound:
-        print(f"\n--- Checking single UID: {lower_bound:012x} ---")
-        uid_to_check = struct.pack(">Q", lower_bound)[2:]
-
-        # Per RDM spec, send DISC_MUTE directly when at the lowest branch.
-        # A device will respond with an ACK if it exists at this UID.
-        rdm_packet_mute = build_rdm_packet(
-            uid_to_check, tn, DISCOVERY_COMMAND, DISC_MUTE
-        )
-        robe_packet_mute = build_robe_packet(
-            PACKET_TYPE_RDM_PACKET_OUT, rdm_packet_mute
-        )
-
-        status, data = send_and_receive(
-            ser, f"Mute Check ({uid_to_check.hex()})", robe_packet_mute, DISC_MUTE
-        )
-        tn += 1
-
-        if status == "ack":
-            uid = uid_to_check
-            if uid not in discovered_uids:
-                print(f"--- Found new device: {uid.hex(':')} ---")
-                discovered_uids.append(uid)
-        return tn
-
-    # Recursive step for a range
-    print(f"\n--- Searching range: {lower_bound:012x} to {upper_bound:012x} ---")
-    pd = struct.pack(">Q", lower_bound)[2:] + struct.pack(">Q", upper_bound)[2:]
-    rdm_packet = build_rdm_packet(
-        BROADCAST_ALL_DEVICES_ID, tn, DISCOVERY_COMMAND, DISC_UNIQUE_BRANCH, pd
-    )
-    robe_packet = build_robe_packet(PACKET_TYPE_RDM_DISCOVERY_UNIQUE_BRANCH, rdm_packet)
-
-    status, data = send_and_receive(
-        ser,
-        f"Discovery Branch ({lower_bound:012x}-{upper_bound:012x})",
-        robe_packet,
-        DISC_UNIQUE_BRANCH,
-    )
-    tn += 1
-
-    # If there was any kind of response (a single UID or a collision),
-    # we need to take action.
-    if status == "uid":
-        uid = data
-        if uid not in discovered_uids:
-            print(f"--- Found new device: {uid.hex(':')} ---")
-            discovered_uids.append(uid)
-            # Mute the device so it doesn't respond to further discovery messages
-            rdm_packet_mute = build_rdm_packet(uid, tn, DISCOVERY_COMMAND, DISC_MUTE)
+    # pending ranges, the last one is searched next like in a depth first
+    # recursion, so the requests are sent in the same order
+    ranges = [(lower_bound, upper_bound)]
+    while ranges:
+        lower_bound, upper_bound = ranges.pop()
+        if lower_bound > upper_bound:
+            continue
+
+        # Base case: If we are searching a single UID, try to mute it.
+        if lower_bound == upper_bound:
+            if VERBOSE:
+                print(f"\n--- Checking single UID: {lower_bound:012x} ---")
+            uid_to_check = lower_bound.to_bytes(6)
+
+            # Per RDM spec, send DISC_MUTE directly when at the lowest branch.
+            # A device will respond with an ACK if it exists at this UID.
+            rdm_packet_mute = build_rdm_packet(
+                uid_to_check, tn, DISCOVERY_COMMAND, DISC_MUTE
+            )
             robe_packet_mute = build_robe_packet(
                 PACKET_TYPE_RDM_PACKET_OUT, rdm_packet_mute
             )
-            send_and_receive(
-                ser, f"Mute Device ({uid.hex()})", robe_packet_mute, DISC_MUTE
+
+            status, data = send_and_receive(
+                ser, f"Mute Check ({uid_to_check.hex()})", robe_packet_mute, DISC_MUTE
             )
             tn += 1
 
-        # After muting, search the same range again to find other devices.
-        # If the muted device was the only one, the next search will yield 'no_response'.
-        tn = binary_search_branch(ser, tn, lower_bound, upper_bound, discovered_uids)
+            if status == "ack":
+                uid = uid_to_check
+                if uid not in discovered_uids:
+                    if VERBOSE:
+                        print(f"--- Found new device: {uid.hex(':')} ---")
+                    discovered_uids.add(uid)
+            continue
 
-    elif status == "collision":
-        print("--- Collision detected, branching... ---")
-        mid_point = (lower_bound + upper_bound) // 2
-        tn = binary_search_branch(ser, tn, lower_bound, mid_point, discovered_uids)
-        tn = binary_search_branch(ser, tn, mid_point + 1, upper_bound, discovered_uids)
+        if VERBOSE:
+            print(
+                f"\n--- Searching range: {lower_bound:012x} to {upper_bound:012x} ---"
+            )
+        # lower and upper bound UIDs, 6 bytes each
+        pd = (lower_bound << 48 | upper_bound).to_bytes(12)
+        rdm_packet = build_rdm_packet(
+            BROADCAST_ALL_DEVICES_ID, tn, DISCOVERY_COMMAND, DISC_UNIQUE_BRANCH, pd
+        )
+        robe_packet = build_robe_packet(
+            PACKET_TYPE_RDM_DISCOVERY_UNIQUE_BRANCH, rdm_packet
+        )
 
-    else:  # 'no_response' or other
-        print("--- No devices in this range. ---")
+        status, data = send_and_receive(
+            ser,
+            f"Discovery Branch ({lower_bound:012x}-{upper_bound:012x})",
+            robe_packet,
+            DISC_UNIQUE_BRANCH,
+        )
+        tn += 1
+
+        # If there was any kind of response (a single UID or a collision),
+        # we need to take action.
+        if status == "uid":
+            uid = data
+            if uid not in discovered_uids:
+                if VERBOSE:
+                    print(f"--- Found new device: {uid.hex(':')} ---")
+                discovered_uids.add(uid)
+                # Mute the device so it doesn't respond to further discovery messages
+                rdm_packet_mute = build_rdm_packet(
+                    uid, tn, DISCOVERY_COMMAND, DISC_MUTE
+                )
+                robe_packet_mute = build_robe_packet(
+                    PACKET_TYPE_RDM_PACKET_OUT, rdm_packet_mute
+                )
+                send_and_receive(
+                    ser, f"Mute Device ({uid.hex()})", robe_packet_mute, DISC_MUTE
+                )
+                tn += 1
+
+            # After muting, search the same range again to find other devices.
+            # If the muted device was the only one, the next search will yield 'no_response'.
+            ranges.append((lower_bound, upper_bound))
+
+        elif status == "collision":
+            if VERBOSE:
+                print("--- Collision detected, branching... ---")
+            mid_point = (lower_bound + upper_bound) // 2
+            ranges.append((mid_point + 1, upper_bound))
+            ranges.append((lower_bound, mid_point))
+
+        elif VERBOSE:  # 'no_response' or other
+            print("--- No devices in this range. ---")
 
     return tn
 
@@ -482,10 +603,11 @@ def discover_all_devices(ser: serial.Serial, tn: int):
     Discovers all RDM devices on the line using a binary search algorithm.
     Finally, it un-mutes all discovered devices.
     """
-    discovered_uids = []
+    discovered_uids = set()
 
     # 1. Un-mute all devices to start fresh
-    print("\n--- Sending Un-Mute All to start discovery ---")
+    if VERBOSE:
+        print("\n--- Sending Un-Mute All to start discovery ---")
     rdm_packet_unmute = build_rdm_packet(
         BROADCAST_ALL_DEVICES_ID, tn, DISCOVERY_COMMAND, DISC_UN_MUTE
     )
@@ -501,7 +623,8 @@ def discover_all_devices(ser: serial.Serial, tn: int):
 
     # 3. Un-mute all discovered devices so they can be addressed normally
     if discovered_uids:
-        print("\n--- Un-muting all discovered devices ---")
+        if VERBOSE:
+            print("\n--- Un-muting all discovered devices ---")
         rdm_packet_unmute_final = build_rdm_packet(
             BROADCAST_ALL_DEVICES_ID, tn, DISCOVERY_COMMAND, DISC_UN_MUTE
         )
@@ -512,17 +635,18 @@ def discover_all_devices(ser: serial.Serial, tn: int):
             ser, "Un-Mute All Devices", robe_packet_unmute_final, DISC_UN_MUTE
         )
         tn += 1
-    else:
+    elif VERBOSE:
         print("\n--- No devices were found during discovery. ---")
 
-    return discovered_uids, tn
+    return sorted(discovered_uids), tn
 
 
 def get_device_parameters(ser: serial.Serial, discovered_uid: bytes, tn: int):
     """
     Retrieves a standard set of parameters from a discovered RDM device.
     """
-    print(f"\n--- Getting parameters for device: {discovered_uid.hex(':')} ---")
+    if VERBOSE:
+        print(f"\n--- Getting parameters for device: {discovered_uid.hex(':')} ---")
 
     device_data = {"uid": discovered_uid.hex(":")}
 
@@ -547,9 +671,7 @@ def get_device_parameters(ser: serial.Serial, discovered_uid: bytes, tn: int):
         if status == "ack" and data and data[1] is not None:
             # data is (pid, response_data)
             returned_pid, response_data = data
-            pid_name_key = RDM_PARAMETER_NAMES.get(
-                returned_pid, f"pid_{returned_pid}"
-            ).lower()
+            pid_name_key = _DEVICE_DATA_KEYS.get(returned_pid) or f"pid_{returned_pid}"
             device_data[pid_name_key] = response_data
 
     return device_data, tn
@@ -563,9 +685,9 @@ def get_device_info(device_port):
         return False
     robe_packet = build_robe_packet(PACKET_TYPE_RDM_INFO_COMMAND, b"")
     ser.write(robe_packet)
-    time.sleep(0.2)
-    response = ser.read(ser.in_waiting)
-    print("response", response)
+    response = read_robe_packet(ser)
+    if VERBOSE:
+        print("response", response)
     ser.close()
     if response and response[0] == HEADER:
         if response[1] == PACKET_TYPE_RDM_INFO_RESPONSE:
@@ -576,9 +698,11 @@ def get_devices(ser):
     """Main function to run the device search and communication flow."""
 
     tn = 0  # Transaction Number
-    print("--- Starting RDM Discovery ---")
+    if VERBOSE:
+        print("--- Starting RDM Discovery ---")
     discovered_uids, tn = discover_all_devices(ser, tn)
-    print("found this", discovered_uids)
+    if VERBOSE:
+        print("found this", discovered_uids)
     return discovered_uids, tn
 
 
@@ -588,6 +712,7 @@ def get_device_details(ser, uid, tn):
 
 
 if __name__ == "__main__":
+    VERBOSE = True
     try:
         ser = serial.Serial("/dev/ttyUSB0", baudrate=250000, timeout=0.1)
     except serial.SerialException as e:
@@ -15,38 +15,101 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from types import SimpleNamespace
-from textual.screen import ModalScreen
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass
+from textual.screen import ModalScreen, ScreenResultType
 from textual.app import ComposeResult
 from textual.containers import Grid, Horizontal, Vertical, VerticalScroll
 from textual.widgets import Button, Static, Input, Label, Select, Switch
-from textual import work, events
+from textual import work
+from rich.text import Text
 from tui.messages import (
     NetworkDevicesDiscovered,
     RdmDevicesDiscovered,
     RdmDeviceDetailDiscovered,
     RdmDiscoveryMessage,
 )
-from tui.network import get_network_cards
-from tui.artnet import ArtNetDiscovery
-from tui.llrp import LlrpDiscovery
-from tui.rdm_search import get_device_info, get_devices, get_port, get_device_details
+import asyncio
+import functools
 import re
-import sys
-import serial
-import serial.tools.list_ports
-
-
-class QuitScreen(ModalScreen[bool]):
-    """Screen with a dialog to confirm quitting."""
+import threading
+import time
+
+# probed Robe interfaces and network cards, kept for reopening the
+# discovery dialog
+USB_DEVICES_TTL = 5.0
+_usb_devices_cache = (None, [])  # monotonic time of the probe, ports
+NETWORK_CARDS_TTL = 30.0
+_network_cards_cache = {}  # show_link_local_addresses: (monotonic time, cards)
+_network_cards_lock = threading.Lock()
+# USB port probes and LLRP polls block on I/O, they share these threads
+_discovery_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="discovery")
+
+# DMX address and universe in an Art-Net long name
+_DMX_UNIVERSE_RE = re.compile(r"DMX:\s*(\d+)\s*Universe:\s*(\d+)")
+
+
+# rigs are often many identical nodes sending the same long name
+@functools.lru_cache(maxsize=256)
+def _extract_uni_dmx(long_name: str) -> tuple:
+    match = _DMX_UNIVERSE_RE.search(long_name)
+    if match:
+        # kept as text, an Art-Net universe 0 is shown while the 0 of
+        # devices without a universe is not
+        return match.group(2), match.group(1)
+    return None, None
+
+
+def cached_network_cards(link_local: bool) -> list:
+    """get_network_cards, reusing the interfaces listed in the last 30 seconds."""
+    # ifaddr is imported here, in the workers, and not at app startup
+    from tui.network import get_network_cards
+
+    # a caller arriving during a listing waits for it instead of listing again
+    with _network_cards_lock:
+        listed, networks = _network_cards_cache.get(link_local, (None, None))
+        if listed is None or time.monotonic() - listed > NETWORK_CARDS_TTL:
+            networks = get_network_cards(show_link_local_addresses=link_local)
+            _network_cards_cache[link_local] = (time.monotonic(), networks)
+    return networks
+
+
+class DialogScreen(ModalScreen[ScreenResultType]):
+    """A modal dialog, moved through with the arrow keys and closed with escape."""
 
     BINDINGS = [
         ("left", "focus_previous", "Focus Previous"),
         ("right", "focus_next", "Focus Next"),
         ("up", "focus_previous", "Focus Previous"),
         ("down", "focus_next", "Focus Next"),
+        ("escape", "close", "Close"),
     ]
 
+    def action_focus_next(self) -> None:
+        self.focus_next()
+
+    def action_focus_previous(self) -> None:
+        self.focus_previous()
+
+    def action_close(self) -> None:
+        self.dismiss()  # Close the modal
+
+
+@dataclass(slots=True)
+class DiscoveredDevice:
+    """A discovered device, as it is added to an MVR layer."""
+
+    short_name: str = ""
+    ip_address: str | None = None
+    universe: int | str | None = None
+    address: int | str | None = None
+    uid: str | None = None  # RDM devices only
+
+
+class QuitScreen(DialogScreen[bool]):
+    """Screen with a dialog to confirm quitting."""
+
     def compose(self) -> ComposeResult:
         yield Grid(
             Static("[bold]Are you sure you want to quit?[/bold]", id="question"),
@@ -64,27 +127,10 @@ class QuitScreen(ModalScreen[bool]):
         else:
             self.dismiss(False)
 
-    def action_focus_next(self) -> None:
-        self.focus_next()
-
-    def action_focus_previous(self) -> None:
-        self.focus_previous()
-
-    async def on_key(self, event: events.Key) -> None:
-        if event.key == "escape":
-            self.dismiss()  # Close the modal
-
 
-class ConfigScreen(ModalScreen[dict]):
+class ConfigScreen(DialogScreen[dict]):
     """Screen with a dialog to configure URL, username and password."""
 
-    BINDINGS = [
-        ("left", "focus_previous", "Focus Previous"),
-        ("right", "focus_next", "Focus Next"),
-        ("up", "focus_previous", "Focus Previous"),
-        ("down", "focus_next", "Focus Next"),
-    ]
-
     def __init__(self) -> None:
         super().__init__()
 
@@ -132,22 +178,24 @@ class ConfigScreen(ModalScreen[dict]):
 
     def on_mount(self) -> None:
         """Load existing data into the input fields."""
-        self.query_one("#artnet_timeout").value = self.app.configuration.artnet_timeout
-        self.query_one("#show_debug").value = self.app.configuration.show_debug
+        configuration = self.app.configuration
+        self.query_one("#artnet_timeout").value = configuration.artnet_timeout
+        self.query_one("#show_debug").value = configuration.show_debug
         self.query_one(
             "#show_link_local_addresses"
-        ).value = self.app.configuration.show_link_local_addresses
-        self.query_one("#gdtf_username").value = self.app.configuration.gdtf_username
-        self.query_one("#gdtf_password").value = self.app.configuration.gdtf_password
+        ).value = configuration.show_link_local_addresses
+        self.query_one("#gdtf_username").value = configuration.gdtf_username
+        self.query_one("#gdtf_password").value = configuration.gdtf_password
 
     def update_config(self):
-        self.app.configuration.artnet_timeout = self.query_one("#artnet_timeout").value
-        self.app.configuration.show_debug = self.query_one("#show_debug").value
-        self.app.configuration.show_link_local_addresses = self.query_one(
+        configuration = self.app.configuration
+        configuration.artnet_timeout = self.query_one("#artnet_timeout").value
+        configuration.show_debug = self.query_one("#show_debug").value
+        configuration.show_link_local_addresses = self.query_one(
             "#show_link_local_addresses"
         ).value
-        self.app.configuration.gdtf_username = self.query_one("#gdtf_username").value
-        self.app.configuration.gdtf_password = self.query_one("#gdtf_password").value
+        configuration.gdtf_username = self.query_one("#gdtf_username").value
+        configuration.gdtf_password = self.query_one("#gdtf_password").value
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "save":
@@ -157,69 +205,96 @@ class ConfigScreen(ModalScreen[dict]):
         else:
             self.dismiss()
 
-    def action_focus_next(self) -> None:
-        self.focus_next()
-
-    def action_focus_previous(self) -> None:
-        self.focus_previous()
-
-    async def on_key(self, event: events.Key) -> None:
-        if event.key == "escape":
-            self.dismiss()  # Close the modal
-
 
-class ArtNetScreen(ModalScreen):
+class ArtNetScreen(DialogScreen):
     """Screen with a dialog to confirm quitting."""
 
-    networks = []
-    network = None
-    BINDINGS = [
-        ("left", "focus_previous", "Focus Previous"),
-        ("right", "focus_next", "Focus Next"),
-        ("up", "focus_previous", "Focus Previous"),
-        ("down", "focus_next", "Focus Next"),
-    ]
-    discovered_devices = []
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.networks = []
+        self.usb_devices = []
+        self.network = None
+        self.discovered_devices = []
+        self._uid_index = {}  # RDM uid: position in discovered_devices
+        self._result_lines = []  # rendered discovered_devices
+        # device details arriving within one frame are rendered together
+        self._pending_details = {}
+        self._details_timer = None
 
     def compose(self) -> ComposeResult:
         with Vertical(id="all_around"):
             yield Static("Discovery", id="question")
             with Horizontal(id="row2"):
-                yield Button("Discover", id="do_start")
+                # enabled once an interface is selected
+                yield Button("Discover", id="do_start", disabled=True)
                 yield Button("Close", id="close_discovery")
-            yield Select([("", "")], id="networks_select", allow_blank=False)
+            yield Select(
+                [("Loading interfaces...", "")], id="networks_select", allow_blank=False
+            )
             yield Static("", id="network")
             with VerticalScroll(id="results"):
                 yield Static("", id="results_text")
 
     def on_mount(self):
-        select_widget = self.query_one("#networks_select", Select)
-        self.networks = get_network_cards(
-            show_link_local_addresses=self.app.configuration.show_link_local_addresses
+        # both can take a while, the lists are filled in as they arrive
+        self.load_network_cards()
+        self.get_robe_usb_devices()
+
+    @work(thread=True)
+    def load_network_cards(self) -> None:
+        """Enumerate the network interfaces in a background worker."""
+        networks = cached_network_cards(
+            self.app.configuration.show_link_local_addresses
         )
-        select_widget.set_options(self.networks)
-        if any(ip == "0.0.0.0" for name, ip in self.networks):
+        self.app.call_from_thread(self.update_network_cards_list, networks)
+
+    def update_network_cards_list(self, networks: list) -> None:
+        self.networks = networks
+        self.update_networks_select()
+
+    def update_networks_select(self) -> None:
+        """Show the network interfaces and USB devices found so far."""
+        options = self.networks + self.usb_devices
+        if not options:
+            return
+        select_widget = self.query_one("#networks_select", Select)
+        select_widget.set_options(options)
+        if any(ip == "0.0.0.0" for name, ip in options):
             select_widget.value = "0.0.0.0"  # for Win
-        select_widget.refresh()  # Force redraw
-        self.get_robe_usb_devices()
 
     @work(thread=True)
     def get_robe_usb_devices(self) -> None:
         """Find USB devices in a background worker."""
-        devices = []
-        ports = serial.tools.list_ports.comports()
-        for port in ports:
-            print(f"Found port: {port.device} - {port.description}")
-            if get_device_info(port.device):
-                devices.append(port)
+        # pyserial is only needed once the discovery dialog is open
+        import serial.tools.list_ports
+
+        from tui.rdm_search import get_device_info
+
+        global _usb_devices_cache
+        probed, devices = _usb_devices_cache
+        if probed is None or time.monotonic() - probed > USB_DEVICES_TTL:
+            ports = []
+            for port in serial.tools.list_ports.comports():
+                self.log(f"Found port: {port.device} - {port.description}")
+                # the interface is a USB device, don't probe serial ports
+                # without a vendor ID
+                if port.vid is not None:
+                    ports.append(port)
+            # every probe waits for the port to answer, run them side by side
+            found = list(
+                _discovery_executor.map(get_device_info, (p.device for p in ports))
+            )
+            devices = [port for port, is_robe in zip(ports, found) if is_robe]
+            _usb_devices_cache = (time.monotonic(), devices)
         self.app.call_from_thread(self.update_usb_devices_list, devices)
 
     def update_usb_devices_list(self, devices: list) -> None:
         """Update the Select widget with the found devices."""
-        sel = self.query_one("#networks_select", Select)
-        options = self.networks
-        options += [(f"RUNIT: {port.device}", port.device) for port in devices]
-        sel.set_options(options)
+        usb_devices = [(f"RUNIT: {port.device}", port.device) for port in devices]
+        # rebuilding the options resets the selection, only do it for a change
+        if usb_devices != self.usb_devices:
+            self.usb_devices = usb_devices
+            self.update_networks_select()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "do_start":
@@ -231,20 +306,26 @@ class ArtNetScreen(ModalScreen):
             btn.disabled = True
             btn.label = "...discovering..."
         if event.button.id == "close_discovery":
+            self._apply_device_details()
             self.dismiss(self.discovered_devices)
 
     def on_select_changed(self, event: Select.Changed) -> None:
-        if str(event.value) and str(event.value) != "Select.BLANK":
-            self.network = str(event.value)
-            self.query_one("#network").update(f"{self.network}")
+        network = str(event.value)
+        if network and network != "Select.BLANK":
+            # set_options re-selects on every interface or USB refresh
+            if network != self.network:
+                self.network = network
+                self.query_one("#network").update(network)
             self.query_one("#do_start").disabled = False
 
     @work(thread=True)
-    async def run_rdm_discovery(self) -> str:
+    def run_rdm_discovery(self) -> str:
+        from tui.rdm_search import get_device_details, get_devices, get_port
+
         port = None
         try:
             results_widget = self.query_one("#results_text", Static)
-            results_widget.update("Searching...")
+            self.app.call_from_thread(results_widget.update, "Searching...")
             port = get_port(self.network)
             discovered_uids, tn = get_devices(port)
             uid_list = [{"uid": uid.hex(":")} for uid in discovered_uids]
@@ -263,27 +344,43 @@ class ArtNetScreen(ModalScreen):
             if port and port.is_open:
                 port.close()
 
-    @work(thread=True)
+    @work()
     async def run_network_discovery(self) -> str:
+        from tui.artnet import ArtNetDiscovery
+
         results_widget = self.query_one("#results_text", Static)
         try:
-            results_widget.update(
+            searching = (
                 f"Searching... timeout is {self.app.configuration.artnet_timeout} sec."
             )
+            results_widget.update(searching)
             timeout = float(self.app.configuration.artnet_timeout)
             artnet = ArtNetDiscovery(bind_ip=self.network)
             artnet.start()
-            artnet_result = artnet.discover_devices(timeout=timeout)
-            artnet.stop()
-
-            llrp_result = []
+            # also when the dialog is dismissed mid-discovery, a socket left
+            # bound makes the next discovery fail
             try:
-                llrp = LlrpDiscovery(bind_ip=self.network)
-                llrp.start()
-                llrp_result = llrp.discover_devices(timeout=timeout)
-                llrp.stop()
-            except Exception as llrp_error:
-                print(f"LLRP discovery failed: {llrp_error}")
+                # LLRP is polled in a thread while Art-Net replies are awaited
+                loop = asyncio.get_running_loop()
+                llrp_future = loop.run_in_executor(
+                    _discovery_executor, self.run_llrp_discovery, timeout
+                )
+                artnet_result = []
+                lines = []
+                async with aclosing(artnet.iter_devices(timeout=timeout)) as replies:
+                    async for device in replies:
+                        # show the nodes as they reply, LLRP devices are
+                        # merged in once both are done
+                        artnet_result.append(device)
+                        lines.append(
+                            self._format_network_line(self._network_device(device))
+                        )
+                        results_widget.update(
+                            Text(f"{searching}\n\n" + "\n".join(lines))
+                        )
+                llrp_result = await llrp_future
+            finally:
+                artnet.stop()
 
             device_map = {}
             for device in artnet_result:
@@ -309,16 +406,28 @@ class ArtNetScreen(ModalScreen):
         except Exception as e:
             self.post_message(NetworkDevicesDiscovered(error=str(e)))
 
+    def run_llrp_discovery(self, timeout):
+        from tui.llrp import LlrpDiscovery
+
+        try:
+            llrp = LlrpDiscovery(bind_ip=self.network)
+            try:
+                llrp.start()
+                return llrp.discover_devices(timeout=timeout)
+            finally:
+                llrp.stop()
+        except Exception as llrp_error:
+            self.log(f"LLRP discovery failed: {llrp_error}")
+            return []
+
     def extract_uni_dmx(self, long_name):
-        address = None
-        universe = None
-        match = None
-        if long_name is not None:
-            match = re.search(r"DMX:\s*(\d+)\s*Universe:\s*(\d+)", long_name)
-        if match:
-            address = match.group(1)
-            universe = match.group(2)
-        return universe, address
+        # many nodes leave the long name empty
+        if not long_name:
+            return None, None
+        return _extract_uni_dmx(long_name)
+
+    def _format_device_line(self, item) -> str:
+        return f"{item.short_name} {f'IP Address: {item.ip_address}' if item.ip_address else ''} {f'Universe: {item.universe}' if item.universe else ''} {f'DMX: {item.address}' if item.address else ''}"
 
     def on_rdm_discovery_message(self, message: RdmDiscoveryMessage) -> None:
         btn = self.query_one("#do_start")
@@ -347,127 +456,141 @@ class ArtNetScreen(ModalScreen):
         #   "software_version_label": "Sw.ver. 4.3",
         #   "dmx_start_address": 1,
         # }
-        results_widget = self.query_one("#results_text", Static)
-        if message.devices:
-            for device in message.devices:
-                uid = device.get("uid", None)
-                if uid is None:
-                    continue
-
-                short_name = device.get("device_model_description", uid)
-                device_info = device.get("device_info", {})
-                universe = 0
-                ip_address = ""
-                address = device_info.get("dmx_start_address", "")
-                devices.append(
-                    SimpleNamespace(
-                        uid=uid,
-                        ip_address=ip_address,
-                        short_name=short_name,
-                        universe=universe,
-                        address=address,
-                    )
+        for device in message.devices or ():
+            uid = device.get("uid", None)
+            if uid is None:
+                continue
+
+            short_name = device.get("device_model_description", uid)
+            device_info = device.get("device_info", {})
+            universe = 0
+            ip_address = ""
+            address = device_info.get("dmx_start_address", "")
+            devices.append(
+                DiscoveredDevice(
+                    uid=uid,
+                    ip_address=ip_address,
+                    short_name=short_name,
+                    universe=universe,
+                    address=address,
                 )
-            result = "\n".join(
-                f"{item.short_name} {f'IP Address: {item.ip_address}' if item.ip_address else ''} {f'Universe: {item.universe}' if item.universe else ''} {f'DMX: {item.address}' if item.address else ''}"
-                for item in devices
             )
+        if not devices:
+            self._show_no_devices(message.error)
+            return
 
-        if devices:
-            result = f"[green]Found {len(devices)}:[/green]\n\n{result}"
-
-        else:
-            result = f"[red]No devices found {message.error}[/red]"
-
+        self._result_lines = [self._format_device_line(item) for item in devices]
+        result = "\n".join(self._result_lines)
         self.discovered_devices = devices
-        results_widget.update(result)
-
-        if len(devices):
-            btn = self.query_one("#close_discovery")
-            btn.label = f"Add {len(devices)} device{'s' if len(devices) > 1 else ''} to MVR Layer"
+        self._uid_index = {device.uid: i for i, device in enumerate(devices)}
+        self.query_one("#results_text", Static).update(
+            Text.assemble((f"Found {len(devices)}:", "green"), "\n\n", result)
+        )
+        btn = self.query_one("#close_discovery")
+        btn.label = (
+            f"Add {len(devices)} device{'s' if len(devices) > 1 else ''} to MVR Layer"
+        )
 
     def on_rdm_device_detail_discovered(
         self, message: RdmDeviceDetailDiscovered
     ) -> None:
-        """Update a single device with details."""
+        """Queue the details of a single device for the next render."""
         if message.data:
-            uid_to_update = message.data.get("uid")
-            for i, device in enumerate(self.discovered_devices):
-                if device.uid == uid_to_update:
-                    device.short_name = message.data.get(
-                        "device_model_description", device.uid
-                    )
-                    device_info = message.data.get("device_info", {})
-                    device.address = device_info.get("dmx_start_address", "")
-                    self.discovered_devices[i] = device
-                    break
+            self._pending_details[message.data.get("uid")] = message.data
+            if self._details_timer is None:
+                self._details_timer = self.set_timer(0.05, self._apply_device_details)
+
+    def _apply_device_details(self) -> None:
+        """Update the devices with the queued details and render them once."""
+        if self._details_timer is not None:
+            self._details_timer.stop()
+            self._details_timer = None
+        if self._pending_details:
+            pending, self._pending_details = self._pending_details, {}
+            for uid, data in pending.items():
+                i = self._uid_index.get(uid)
+                if i is None:
+                    continue
+                device = self.discovered_devices[i]
+                device.short_name = data.get("device_model_description", device.uid)
+                device_info = data.get("device_info", {})
+                device.address = device_info.get("dmx_start_address", "")
+                self._result_lines[i] = self._format_device_line(device)
 
             # Regenerate the results text
-            results_text = "\n".join(
-                f"{item.short_name} {f'IP Address: {item.ip_address}' if item.ip_address else ''} {f'Universe: {item.universe}' if item.universe else ''} {f'DMX: {item.address}' if item.address else ''}"
-                for item in self.discovered_devices
-            )
+            results_text = "\n".join(self._result_lines)
             results_widget = self.query_one("#results_text", Static)
             results_widget.update(
-                f"[green]Found {len(self.discovered_devices)}:[/green]\n\n{results_text}"
-            )
-
-    def on_network_devices_discovered(self, message: NetworkDevicesDiscovered) -> None:
-        devices = []
-        results_widget = self.query_one("#results_text", Static)
-        if message.devices:
-            for device in message.devices:
-                short_name = device.get("short_name", "No Name")
-                universe, address = self.extract_uni_dmx(device.get("long_name", ""))
-                ip_address = device.get("source_ip", None)
-                devices.append(
-                    SimpleNamespace(
-                        ip_address=ip_address,
-                        short_name=short_name,
-                        universe=universe,
-                        address=address,
-                    )
+                Text.assemble(
+                    (f"Found {len(self.discovered_devices)}:", "green"),
+                    "\n\n",
+                    results_text,
                 )
-            result = "\n".join(
-                f"{item.short_name} {item.ip_address} {item.universe or ''} {item.address or ''}"
-                for item in devices
             )
 
-        if devices:
-            result = f"[green]Found {len(devices)}:[/green]\n\n{result}"
+    def _network_device(self, device: dict):
+        short_name = device.get("short_name", "No Name")
+        universe, address = self.extract_uni_dmx(device.get("long_name", ""))
+        ip_address = device.get("source_ip", None)
+        return DiscoveredDevice(
+            ip_address=ip_address,
+            short_name=short_name,
+            universe=universe,
+            address=address,
+        )
 
-        else:
-            result = f"[red]No devices found {message.error}[/red]"
+    def _format_network_line(self, item) -> str:
+        return f"{item.short_name} {item.ip_address} {item.universe or ''} {item.address or ''}"
 
-        self.discovered_devices = devices
-        results_widget.update(result)
-        if len(devices):
-            btn = self.query_one("#close_discovery")
-            btn.label = f"Add {len(devices)} device{'s' if len(devices) > 1 else ''} to MVR Layer"
+    def on_network_devices_discovered(self, message: NetworkDevicesDiscovered) -> None:
+        if not message.devices:
+            self._show_no_devices(message.error)
+            return
 
-    def action_focus_next(self) -> None:
-        self.focus_next()
+        devices = []
+        lines = []
+        for device in message.devices:
+            item = self._network_device(device)
+            devices.append(item)
+            lines.append(self._format_network_line(item))
+        result = "\n".join(lines)
 
-    def action_focus_previous(self) -> None:
-        self.focus_previous()
+        self.discovered_devices = devices
+        self._uid_index = {}
+        self._result_lines = []
+        self.query_one("#results_text", Static).update(
+            Text.assemble((f"Found {len(devices)}:", "green"), "\n\n", result)
+        )
+        btn = self.query_one("#close_discovery")
+        btn.label = (
+            f"Add {len(devices)} device{'s' if len(devices) > 1 else ''} to MVR Layer"
+        )
 
-    async def on_key(self, event: events.Key) -> None:
-        if event.key == "escape":
-            self.dismiss(self.discovered_devices)  # Close the modal
+    def _show_no_devices(self, error: str) -> None:
+        """Clear the results after a search that found nothing or failed."""
+        self.discovered_devices = []
+        self._uid_index = {}
+        self._result_lines = []
+        self.query_one("#results_text", Static).update(
+            Text(f"No devices found {error}", "red")
+        )
+        # the workers only re-enable the button after a successful search
+        btn = self.query_one("#do_start")
+        btn.disabled = False
+        btn.label = "Discover"
 
+    def action_close(self) -> None:
+        self._apply_device_details()
+        self.dismiss(self.discovered_devices)  # Close the modal
 
-class ImportDiscovery(ModalScreen):
-    BINDINGS = [
-        ("left", "focus_previous", "Focus Previous"),
-        ("right", "focus_next", "Focus Next"),
-        ("up", "focus_previous", "Focus Previous"),
-        ("down", "focus_next", "Focus Next"),
-    ]
+
+class ImportDiscovery(DialogScreen):
     selected_layer_id = None
     selected_layer_name = None
 
     def __init__(self, data: list | None = None) -> None:
         self.data = data or []
+        self._notify_timer = None
         super().__init__()
 
     def compose(self) -> ComposeResult:
@@ -497,7 +620,8 @@ class ImportDiscovery(ModalScreen):
         )
 
     def on_mount(self):
-        pass
+        # the layers can't change while the dialog is open
+        self._layer_names = {name for name, layer_id in self.app.mvr_layers}
         # self.query_one("#new_layer_widget").disabled = True
         # self.query_one("#add").disabled = True
         # select_widget = self.query_one("#layers_select")
@@ -515,8 +639,7 @@ class ImportDiscovery(ModalScreen):
             self.query_one("#add").disabled = False
 
             new_layer_name = self.query_one("#layer_name").value
-            layer_names = [x[0] for x in self.app.mvr_layers]
-            if new_layer_name in layer_names:
+            if new_layer_name in self._layer_names:
                 self.query_one("#add").disabled = True
 
             return
@@ -530,15 +653,25 @@ class ImportDiscovery(ModalScreen):
         if select_widget.value != "new_layer":
             return
         if event.value:
-            layer_names = [x[0] for x in self.app.mvr_layers]
-            if event.value in layer_names:
+            if event.value in self._layer_names:
                 self.query_one("#add").disabled = True
-                self.notify("Layer name already exists", timeout=1)
+                self._notify_after_typing("Layer name already exists")
             else:
                 self.query_one("#add").disabled = False
+                self._notify_after_typing(None)
         else:
             self.query_one("#add").disabled = True
-            self.notify("Must not be empty", timeout=1)
+            self._notify_after_typing("Must not be empty")
+
+    def _notify_after_typing(self, message: str | None) -> None:
+        """Show the message once typing pauses, not a toast per keystroke."""
+        if self._notify_timer is not None:
+            self._notify_timer.stop()
+            self._notify_timer = None
+        if message:
+            self._notify_timer = self.set_timer(
+                0.15, lambda: self.notify(message, timeout=1)
+            )
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "add":
@@ -554,8 +687,7 @@ class ImportDiscovery(ModalScreen):
         select_widget = self.query_one("#layers_select")
         new_layer_name = self.query_one("#layer_name").value
         if select_widget.value == "new_layer":
-            layer_names = [x[0] for x in self.app.mvr_layers]
-            if new_layer_name in layer_names:
+            if new_layer_name in self._layer_names:
                 self.query_one("#add").disabled = True
                 self.notify("Layer name already exists", timeout=1)
         self.focus_next()
@@ -564,12 +696,7 @@ class ImportDiscovery(ModalScreen):
         select_widget = self.query_one("#layers_select")
         new_layer_name = self.query_one("#layer_name").value
         if select_widget.value == "new_layer":
-            layer_names = [x[0] for x in self.app.mvr_layers]
-            if new_layer_name in layer_names:
+            if new_layer_name in self._layer_names:
                 self.query_one("#add").disabled = True
                 self.notify("Layer name already exists", timeout=1)
         self.focus_previous()
-
-    async def on_key(self, event: events.Key) -> None:
-        if event.key == "escape":
-            self.dismiss()  # Close the modal
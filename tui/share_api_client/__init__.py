@@ -17,9 +17,40 @@
 
 import json
 import os
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
+
+_adapter = None
+_adapter_lock = Lock()
+# downloads are network bound, a few run in parallel on one session
+_download_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gdtf-share")
+
+
+def get_adapter():
+    """Shared adapter, so sessions reuse the keep-alive connections to GDTF Share."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=10,
+                max_retries=Retry(
+                    total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)
+                ),
+            )
+        return _adapter
+
+
+def get_session():
+    """New session with its own cookies, on the shared connection pool."""
+    adapter = get_adapter()
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class Result:
@@ -44,11 +75,15 @@ class GdtfShareApi:
         self.api_password = api_password
         if data_file is not None:
             self.data_file = data_file
-        self.session = requests.Session()
+        self.session = get_session()
 
     def save_json_file(self, data, fname):
-        with open(fname, "w") as a:
-            json.dump(data, a)
+        # json.dumps runs the C encoder in one go, json.dump streams the
+        # pure Python one. Replace atomically, the app may be reading it.
+        tmp_name = f"{fname}.tmp"
+        with open(tmp_name, "w") as a:
+            a.write(json.dumps(data))
+        os.replace(tmp_name, fname)
 
     def load_json_file(self, fname):
         try:
@@ -87,43 +122,53 @@ class GdtfShareApi:
         return self.make_call(method="POST", slug="login.php", data=data)
 
     def get_gdtf_files(self, data, file_path):
-        for fixture in data:
-            if self.verbose:
-                print(
-                    "INFO",
-                    fixture.get("fixture"),
-                    fixture.get("manufacturer"),
-                    fixture.get("rid"),
-                )
-            filename = f"{fixture.get('manufacturer').replace(' ', '_').replace('/', '_')}@{fixture.get('fixture').replace(' ', '_').replace('/', '_')}@{fixture.get('rid')}.gdtf"
-
-            res = self.make_call(
-                slug="downloadFile.php", url_params=f"rid={fixture.get('rid')}"
+        """Download the files in parallel, return the first failure or the last result."""
+        if not data:
+            return Result(False, requests.Response())  # nothing to download
+        results = list(
+            _download_executor.map(
+                lambda fixture: self.get_gdtf_file(fixture, file_path), data
+            )
+        )
+        return next((res for res in results if not res.status), results[-1])
+
+    def get_gdtf_file(self, fixture, file_path):
+        if self.verbose:
+            print(
+                "INFO",
+                fixture.get("fixture"),
+                fixture.get("manufacturer"),
+                fixture.get("rid"),
             )
-            with open(os.path.join(file_path, filename), "wb") as out:
-                out.write(res.result.content)
-                print("INFO", f"saved {filename}")
+        filename = f"{fixture.get('manufacturer').replace(' ', '_').replace('/', '_')}@{fixture.get('fixture').replace(' ', '_').replace('/', '_')}@{fixture.get('rid')}.gdtf"
+
+        res = self.make_call(
+            slug="downloadFile.php", url_params=f"rid={fixture.get('rid')}"
+        )
+        with open(os.path.join(file_path, filename), "wb") as out:
+            out.write(res.result.content)
+            print("INFO", f"saved {filename}")
         return res
 
 
-def _update_data(api_username, api_password: str, update, function, data_file=None):
+def _update_data(api_username, api_password: str, function, data_file=None):
     """Updates data.json."""
     gs = GdtfShareApi(api_username, api_password, data_file)
     gs.login()
     result = gs.get_list()
-    update(function, result)
+    function(result)
 
 
-def update_data(api_username, api_password: str, update, function, data_file):
+def update_data(api_username, api_password: str, function, data_file):
     thread = Thread(
         target=_update_data,
-        args=(api_username, api_password, update, function, data_file),
+        args=(api_username, api_password, function, data_file),
     )
     thread.start()
 
 
 def _download_files(
-    api_username, api_password: str, file_path: str, files, update, function, data_file
+    api_username, api_password: str, file_path: str, files, function, data_file
 ):
     """Download GDTF files form GDTF Share.
     @files=[] is list of GDTF files as returned by the API itself,
@@ -140,11 +185,11 @@ def _download_files(
     gs = GdtfShareApi(api_username, api_password, data_file)
     gs.login()
     result = gs.get_gdtf_files(files, file_path)
-    update(function, result)
+    function(result)
 
 
 def download_files(
-    api_username, api_password: str, file_path: str, files, update, function, data_file
+    api_username, api_password: str, file_path: str, files, function, data_file
 ):
     thread = Thread(
         target=_download_files,
@@ -153,7 +198,6 @@ def download_files(
             api_password,
             file_path,
             files,
-            update,
             function,
             data_file,
         ),